@@ -1,438 +1,784 @@
 import requests
+import asyncio
 import json
+import logging
+import os
+import re
+import threading
+from functools import lru_cache, wraps
 from abc import ABC, abstractmethod
+from datetime import date
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from lxml import etree, html as lxml_html
+from requests.adapters import HTTPAdapter
+from requests.packages.urllib3.util.retry import Retry
+from llm_cache import LLMCache, llm_cache
+
+logger = logging.getLogger(__name__)
+
+# Try to import orjson for faster JSON encoding/decoding
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+def _json_dumps(data) -> bytes:
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(data)
+    return json.dumps(data, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+def _json_loads(content):
+    # orjson.JSONDecodeError subclasses json.JSONDecodeError, so callers
+    # can keep catching the stdlib exception either way
+    if ORJSON_AVAILABLE:
+        return orjson.loads(content)
+    return json.loads(content)
+
+# Try to import tiktoken for token-accurate content truncation
+try:
+    import tiktoken
+    TIKTOKEN_AVAILABLE = True
+except ImportError:
+    TIKTOKEN_AVAILABLE = False
+
+# Rough chars-per-token ratio used when tiktoken is unavailable
+_CHARS_PER_TOKEN = 4
+
+@lru_cache(maxsize=1)
+def _get_encoding():
+    """Load the tokenizer once; None if tiktoken or its encoding file is unavailable"""
+    if not TIKTOKEN_AVAILABLE:
+        return None
+    try:
+        return tiktoken.get_encoding("o200k_base")
+    except Exception as e:
+        logger.warning("tiktoken encoding unavailable, falling back to char budget: %s", e)
+        return None
+
+def _truncate_tokens(content, max_tokens):
+    """
+    Cut content to at most max_tokens tokens, so dense ASCII pages use the
+    whole budget and CJK pages don't overrun it
+    Content that already fits is returned as-is (same object, no copy)
+    The OpenAI tokenizer is used as an approximation for every provider
+    """
+    # Cheap early exit: a byte-level BPE token covers at least one UTF-8
+    # byte (a CJK char or emoji can take several tokens, but not more
+    # tokens than bytes)
+    if len(content.encode('utf-8')) <= max_tokens:
+        return content
+
+    encoding = _get_encoding()
+    if encoding is None:
+        max_chars = max_tokens * _CHARS_PER_TOKEN
+        return content if len(content) <= max_chars else content[:max_chars]
+
+    tokens = encoding.encode(content, disallowed_special=())
+    if len(tokens) <= max_tokens:
+        return content
+    return encoding.decode(tokens[:max_tokens])
+
+def _count_tokens(content):
+    """Token count of content (estimated from its length without tiktoken)"""
+    encoding = _get_encoding()
+    if encoding is None:
+        return -(-len(content) // _CHARS_PER_TOKEN)
+    return len(encoding.encode(content, disallowed_special=()))
+
+# Shared HTTP session so every provider reuses pooled keep-alive connections
+# instead of paying a new TCP + TLS handshake per request
+_SESSION = requests.Session()
+
+# Retry transient failures (rate limits, overloaded models, timeouts) with
+# exponential backoff + jitter capped at 30s; 400/401/403 are never retried
+_RETRY = Retry(
+    total=3,
+    connect=3,
+    read=3,
+    status=3,
+    backoff_factor=1,
+    backoff_max=30,
+    backoff_jitter=0.5,
+    status_forcelist=(408, 429, 500, 502, 503, 504),
+    allowed_methods=frozenset(["POST"]),
+    raise_on_status=False
+)
+
+# Pool sizes can be raised for high-concurrency deployments; pool_maxsize
+# is the number of keep-alive connections kept per provider host
+_POOL_CONNECTIONS = int(os.environ.get("AI_HTTP_POOL_CONNECTIONS", "32"))
+_POOL_MAXSIZE = int(os.environ.get("AI_HTTP_POOL_MAXSIZE", "64"))
+_SESSION.mount('https://', HTTPAdapter(pool_connections=_POOL_CONNECTIONS, pool_maxsize=_POOL_MAXSIZE, max_retries=_RETRY))
+_SESSION.headers.update({"Content-Type": "application/json"})
+
+def _iter_sse_events(response):
+    """Yield the JSON payloads of a server-sent events (streaming) response"""
+    # Lines stay as raw bytes: SSE is always UTF-8 and both orjson and
+    # json.loads accept bytes, so no per-line decode is needed
+    for line in response.iter_lines():
+        if not line.startswith(b'data:'):
+            continue
+        payload = line[5:].strip()
+        if payload == b'[DONE]':
+            break
+        try:
+            yield _json_loads(payload)
+        except json.JSONDecodeError:
+            continue
+
+_WHITESPACE_RE = re.compile(r'\s+')
+
+# Pages with less readable text than this can't yield a feed; bail out
+# before paying for an API round trip (empty bodies, error stubs, captchas)
+_MIN_CONTENT_LENGTH = 200
+
+# Pre-extracted articles are sent with one-letter keys (mapped in the
+# instructions); only as many as a feed can hold
+_ARTICLE_KEYS = (("title", "t"), ("link", "l"), ("date", "d"), ("image", "i"), ("content", "c"))
+_MAX_ARTICLES = 10
+
+def _articles_payload(articles, max_tokens):
+    """
+    Serialize pre-extracted article dicts to compact JSON for the prompt
+    Whole trailing articles are dropped until it fits max_tokens, so the
+    model never gets JSON cut mid-object (at least one article is kept)
+    """
+    stubs = [
+        {short: article.get(key) or "" for key, short in _ARTICLE_KEYS}
+        for article in articles[:_MAX_ARTICLES] if isinstance(article, dict)
+    ]
+    payload = _json_dumps(stubs).decode('utf-8')
+    while len(stubs) > 1 and _count_tokens(payload) > max_tokens:
+        stubs.pop()
+        payload = _json_dumps(stubs).decode('utf-8')
+    return payload
+
+# Markdown code fence some models still wrap JSON in, stripped in one pass
+_FENCE_RE = re.compile(r'^\s*```(?:json)?\s*(.*?)\s*```\s*$', re.DOTALL)
+
+def _parse_json_response(content):
+    """Parse the model's JSON output, tolerating a surrounding ```json fence"""
+    match = _FENCE_RE.match(content)
+    return _json_loads(match.group(1) if match else content.strip())
+
+# Subtrees that never hold readable content
+_NOISE_TAGS = ("script", "style", "noscript", "svg", "iframe", "nav", "footer", "form", "button")
+
+def _clean(html_content):
+    """
+    Reduce raw HTML to its readable text (keeping link and image URLs)
+    so the token budget is spent on content instead of markup
+    Pre-extracted text, like the ARTICLE blocks built in app.py, is
+    returned untouched
+    """
+    if not html_content.lstrip().startswith('<'):
+        return html_content
+    
+    try:
+        doc = lxml_html.document_fromstring(html_content)
+    except ValueError:
+        # lxml rejects str input carrying an XML encoding declaration
+        doc = lxml_html.document_fromstring(html_content.encode('utf-8'))
+    except etree.ParserError:
+        return ""  # Nothing but markup/comments
+    
+    # One C-level pass removes every noise subtree (keeping the text after it)
+    etree.strip_elements(doc, *_NOISE_TAGS, with_tail=False)
+    for link in doc.iter('a'):
+        href = link.get('href')
+        if href is None:
+            continue
+        if len(link):
+            link[-1].tail = (link[-1].tail or '') + f" ({href})"
+        else:
+            link.text = (link.text or '') + f" ({href})"
+    for img in doc.iter('img'):
+        src = img.get('src')
+        if src is not None:
+            img.tail = f" [IMAGE: {src}] " + (img.tail or '')
+    
+    return _WHITESPACE_RE.sub(' ', ' '.join(doc.itertext())).strip()
+
+# JSON schema of the feed every provider must return. It is handed to the
+# provider's native structured-output mode so responses are always valid
+# JSON of this shape (no markdown fences, no free-text preamble)
+FEED_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "title": {"type": "string"},
+        "description": {"type": "string"},
+        "items": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "title": {"type": "string"},
+                    "link": {"type": "string"},
+                    "description": {"type": "string"},
+                    "image": {"type": "string"},
+                    "pubDate": {"type": "string"}
+                },
+                "required": ["title", "link", "description", "image", "pubDate"],
+                "additionalProperties": False
+            }
+        }
+    },
+    "required": ["title", "description", "items"],
+    "additionalProperties": False
+}
+
+_ITEM_FIELDS = ("title", "link", "description", "image", "pubDate")
+
+def _normalize_feed(result):
+    """
+    Validate a parsed feed against FEED_SCHEMA's shape in one walk
+    Missing or non-string fields become "", non-object items are dropped,
+    so callers can index items without defensive checks
+    Items are sorted newest first here rather than asking the model to
+    Returns None if result isn't a feed object at all
+    """
+    if not isinstance(result, dict) or not isinstance(result.get("items", []), list):
+        return None
+    
+    def text(value):
+        return value if isinstance(value, str) else ""
+    
+    items = [
+        {field: text(item.get(field)) for field in _ITEM_FIELDS}
+        for item in result.get("items", []) if isinstance(item, dict)
+    ]
+    # pubDate is YYYY-MM-DD, so string order is date order; the sort is
+    # stable, undated items keep their page order at the end
+    items.sort(key=lambda item: item["pubDate"], reverse=True)
+    
+    return {
+        "title": text(result.get("title")),
+        "description": text(result.get("description")),
+        "items": items
+    }
+
+def _gemini_schema(schema):
+    """Convert a JSON schema to Gemini's OpenAPI subset (upper-case types, no additionalProperties)"""
+    converted = {}
+    for key, value in schema.items():
+        if key == "additionalProperties":
+            continue
+        if key == "type":
+            converted[key] = value.upper()
+        elif key == "properties":
+            converted[key] = {name: _gemini_schema(prop) for name, prop in value.items()}
+        elif key == "items":
+            converted[key] = _gemini_schema(value)
+        else:
+            converted[key] = value
+    return converted
+
+_GEMINI_FEED_SCHEMA = _gemini_schema(FEED_SCHEMA)
+
+# Static instructions go first and the per-request URL/content last, so the
+# prompt prefix is byte-identical across calls and hits provider-side
+# prompt caching (OpenAI, Anthropic and Gemini all key caching on the prefix)
+# One condensed rules block is shared by every provider
+_FEED_INSTRUCTIONS = """
+Extract an RSS feed from the website content given after these instructions.
+The content is either ARTICLE blocks with TITLE, LINK, DATE, IMAGE and CONTENT already extracted from the page,
+or a JSON list of those articles with the fields as t=TITLE, l=LINK, d=DATE, i=IMAGE, c=CONTENT.
+
+Return JSON: {"title": site/page title, "description": brief site description, "items": up to 10 articles}
+Each item: {"title", "link", "description", "image", "pubDate"}
+
+Rules:
+- Copy LINK, IMAGE and DATE exactly from each ARTICLE block; never invent URLs, images or dates
+- Empty LINK -> the website URL; empty IMAGE -> ""; empty DATE -> the TODAY date
+- pubDate format: YYYY-MM-DD
+- description: 100-200 word summary of the article's key points, expanded from its CONTENT
+- One item per article with a unique title; skip navigation and ads
+"""
+
+# Only the dynamic fields are filled in per request; today's date lives
+# here rather than in the instructions so those stay byte-identical
+_PROMPT_TEMPLATE = "URL: {url}\nTODAY: {today}\n\nHTML Content: {content}"
+_GEMINI_PROMPT_TEMPLATE = "Website URL: {url}\nTODAY: {today}\n\nContent: {content}"
+
+# Batch mode: several sites share one request and one copy of the
+# instructions, and the model answers with one feed per site, in order
+_MAX_BATCH_SITES = 4
+_BATCH_SITE_TEMPLATE = "### Site {index}\nURL: {url}\nHTML Content: {content}"
+_BATCH_INSTRUCTIONS = """
+BATCH MODE:
+- The input contains several sites, numbered "### Site 1", "### Site 2", ...
+- Apply the instructions above to each site independently
+- Return {"feeds": [...]} with exactly one feed per site, in the same order
+"""
+BATCH_FEED_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "feeds": {"type": "array", "items": FEED_SCHEMA}
+    },
+    "required": ["feeds"],
+    "additionalProperties": False
+}
+
+def _report_errors(method):
+    """
+    Turn exceptions raised by a provider method into the {"error": ...}
+    dicts callers expect, labelled with the provider's name
+    """
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        try:
+            return method(self, *args, **kwargs)
+        except requests.RequestException as e:
+            logger.warning("%s request exception: %s", self.label, e)
+            # Exhausted read-timeout retries surface as ConnectionError,
+            # so match the message as well as the exception type
+            if isinstance(e, requests.Timeout) or 'timed out' in str(e).lower():
+                return {"error": f"{self.label} timeout após várias tentativas. Tente usar menos conteúdo ou outro provider."}
+            return {"error": f"{self.label} request failed: {str(e)}"}
+        except Exception as e:
+            logger.exception("%s unexpected error: %s", self.label, e)
+            return {"error": f"{self.label} unexpected error: {str(e)}"}
+    return wrapper
 
 class AIProvider(ABC):
+    name = None
+    model = None
+    
     @abstractmethod
     def extract_content(self, url: str, html_content: str) -> dict:
         pass
+    
+    def extract_content_many(self, jobs, max_workers: int = 4) -> list:
+        """
+        Run extract_content for several (url, html_content) jobs concurrently
+        Results are returned in the same order as the jobs
+        """
+        if not jobs:
+            return []
+        
+        # Calls are network-bound, so threads overlap the API round-trips
+        # and total latency is roughly the slowest call instead of the sum
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(jobs))) as executor:
+            return list(executor.map(lambda job: self.extract_content(*job), jobs))
+    
+    async def extract_content_async(self, url: str, html_content: str) -> dict:
+        """
+        Awaitable extract_content so async callers can asyncio.gather many
+        feeds; the blocking request runs in the event loop's thread pool
+        """
+        return await asyncio.to_thread(self.extract_content, url, html_content)
+    
+    def extract_content_batch(self, jobs) -> list:
+        """
+        Extract feeds for several (url, html_content) jobs, in job order
+        Providers that can pack several sites into a single request override
+        this; the default sends one request per site
+        """
+        return self.extract_content_many(jobs)
+    
+    def _cache_key(self, url: str, truncated_content: str) -> str:
+        return LLMCache.make_key(self.name, self.model, url, truncated_content)
 
-class OpenAIProvider(AIProvider):
-    def __init__(self, api_key: str):
+class HTTPLLMProvider(AIProvider):
+    """
+    Shared flow for the HTTP LLM APIs: clean -> truncate -> cache lookup ->
+    streamed schema-constrained request -> parse -> cache
+    Subclasses only describe their endpoint, payload and stream format
+    """
+    label = None
+    base_url = None
+    # Limitar o tamanho do conteúdo (em tokens) para evitar timeouts
+    max_content_tokens = 1500
+    # Appended to truncated content so the model knows the page goes on
+    truncation_marker = ""
+    prompt_template = _PROMPT_TEMPLATE
+    # Sites packed into one request by extract_content_batch (1 = no packing)
+    max_batch_sites = 1
+    # Output cap per site: 10 items with 100-200 word descriptions need
+    # ~2500 tokens, a lower cap would cut the JSON off mid-feed
+    max_output_tokens = 3000
+    
+    def __init__(self, api_key: str, model: str = None):
         self.api_key = api_key
-        self.base_url = "https://api.openai.com/v1/chat/completions"
+        if model:
+            self.model = model
+        self.session = _SESSION
+        # The key never changes for an instance (they are reused per
+        # (provider, api_key)), so auth headers are built once
+        self._headers = self._build_headers()
     
-    def extract_content(self, url: str, html_content: str) -> dict:
-        # Limitar o tamanho do conteúdo para evitar timeouts
-        max_content_length = 6000  # Aumentar para 6000 caracteres
-        truncated_content = html_content[:max_content_length]
-        if len(html_content) > max_content_length:
-            print(f"OpenAI: Content truncated from {len(html_content)} to {max_content_length} chars")
-        
-        prompt = f"""
-        Extract RSS feed information from this website content:
-        URL: {url}
-        
-        HTML Content: {truncated_content}...
-        
-        CRITICAL INSTRUCTIONS:
-        - The content above contains structured ARTICLE blocks with TITLE, LINK, DATE, IMAGE, CONTENT already extracted
-        - YOU MUST USE THE EXACT LINKS PROVIDED - DO NOT CREATE OR GUESS NEW LINKS
-        - YOU MUST USE THE EXACT IMAGES PROVIDED - DO NOT CREATE OR GUESS NEW IMAGES  
-        - YOU MUST USE THE EXACT DATES PROVIDED - DO NOT CREATE OR GUESS NEW DATES
-        - Your job is to organize this data into clean JSON and improve descriptions
-        - DO NOT hallucinate or fabricate URLs - use what's provided
-        
-        Return a JSON with:
-        - title: Main title of the website/page
-        - description: Brief description of the content
-        - items: Array of up to 10 articles/posts with detailed information
-        
-        For each article:
-        - title: Clear, descriptive title
-        - link: **USE THE EXACT LINK PROVIDED IN THE ARTICLE BLOCK** (do not create new URLs!)
-        - description: Detailed summary in 100-200 words explaining what the article is about, key points, and why it's interesting
-        - image: **USE THE EXACT IMAGE PROVIDED IN THE ARTICLE BLOCK** (do not create new image URLs!)
-        - pubDate: **USE THE EXACT DATE PROVIDED IN THE ARTICLE BLOCK** (format as YYYY-MM-DD)
-        
-        CRITICAL IMAGE EXTRACTION:
-        - Use the IMAGE value from each ARTICLE block
-        - If IMAGE is empty, leave as empty string ""
-        - DO NOT fabricate image URLs
-        
-        CRITICAL DATE EXTRACTION:
-        - Use the DATE value from each ARTICLE block
-        - Format as YYYY-MM-DD
-        - If DATE is empty, use current date: 2025-10-30
-        
-        CRITICAL LINK EXTRACTION:
-        - Use the LINK value from each ARTICLE block
-        - DO NOT create or guess article URLs
-        - If LINK is empty, use the base URL: {url}
-        
-        CRITICAL SORTING:
-        *** MUST sort articles by pubDate in DESCENDING order (newest FIRST, oldest LAST) ***
-        *** Article with date 2025-10-28 MUST come BEFORE article with date 2025-10-14 ***
-        *** DO NOT return articles in the order they appear in HTML - SORT BY DATE! ***
+    def _build_headers(self):
+        """Per-instance request headers (auth); None if the API needs none"""
+        return None
+    
+    @abstractmethod
+    def _build_request(self, instructions: str, prompt: str, schema_name: str, schema: dict, max_tokens: int):
+        """Return (url, headers, data) for one streamed request constrained to schema"""
+    
+    @abstractmethod
+    def _event_text(self, event: dict) -> str:
+        """Return the generated text carried by one SSE event"""
+    
+    def _prepare(self, url: str, html_content):
+        """
+        Clean and truncate the content and look it up in the cache
+        html_content is page text/HTML, or a list of article dicts
+        (title, link, date, image, content) extracted upstream
+        Returns (truncated_content, cache_key, result); result is set when
+        no API call is needed (cache hit or unusable content)
+        """
+        if isinstance(html_content, list):
+            # Articles already extracted upstream go out as compact JSON
+            if not html_content:
+                return None, None, {"error": "Insufficient content to extract a feed"}
+            truncated_content = _articles_payload(html_content, self.max_content_tokens)
+        else:
+            html_content = _clean(html_content)
+            if len(html_content) < _MIN_CONTENT_LENGTH:
+                return None, None, {"error": "Insufficient content to extract a feed"}
+            
+            truncated_content = _truncate_tokens(html_content, self.max_content_tokens)
+            if truncated_content is not html_content:
+                logger.debug("%s: content truncated from %d to %d chars", self.label, len(html_content), len(truncated_content))
+                truncated_content += self.truncation_marker
         
-        IMPORTANT: 
-        1. Sort articles by pubDate DESC (newest first) - THIS IS MANDATORY!
-        2. Focus on RECENT articles from 2024-2025
-        3. Extract actual content, not navigation or ads
+        cache_key = self._cache_key(url, truncated_content)
+        return truncated_content, cache_key, llm_cache.get(cache_key)
+    
+    @_report_errors
+    def _complete(self, instructions: str, prompt: str, schema_name: str, schema: dict, max_tokens: int):
+        """
+        Run one streamed request and parse the JSON it produces
+        Returns the parsed JSON, or a dict with an "error" key
         """
+        request_url, headers, data = self._build_request(instructions, prompt, schema_name, schema, max_tokens)
         
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json"
-        }
+        # Streamed so long generations keep bytes flowing instead of
+        # hitting the read timeout while the whole completion is built;
+        # transient failures (429/5xx, timeouts) are retried with
+        # exponential backoff by the session's HTTPAdapter
+        response = self.session.post(request_url, headers=headers, data=_json_dumps(data), timeout=60, stream=True)
+        logger.debug("%s status=%s", self.label, response.status_code)
         
-        data = {
-            "model": "gpt-3.5-turbo",
-            "messages": [{"role": "user", "content": prompt}],
-            "temperature": 0.3
-        }
+        if response.status_code != 200:
+            error_text = response.text[:500]
+            logger.warning("%s API error %s: %s", self.label, response.status_code, error_text)
+            return {"error": f"{self.label} API error: {response.status_code} - {error_text}"}
+        
+        content = ''.join(self._event_text(event) for event in _iter_sse_events(response))
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("%s raw content preview: %s...", self.label, content[:200])
         
         try:
-            response = requests.post(self.base_url, headers=headers, json=data, timeout=60)
-            print(f"OpenAI response status: {response.status_code}")
+            return _parse_json_response(content)
+        except json.JSONDecodeError as e:
+            logger.warning("Failed to parse %s JSON: %s", self.label, e)
+            return {"error": f"Failed to parse {self.label} response: {str(e)}"}
+    
+    @_report_errors
+    def extract_content(self, url: str, html_content: str) -> dict:
+        truncated_content, cache_key, result = self._prepare(url, html_content)
+        if result is not None:
+            return result
+        
+        prompt = self.prompt_template.format_map({"url": url, "today": date.today().isoformat(), "content": truncated_content})
+        result = self._complete(_FEED_INSTRUCTIONS, prompt, "feed", FEED_SCHEMA, self.max_output_tokens)
+        if isinstance(result, dict) and "error" in result:
+            return result
+        
+        feed = _normalize_feed(result)
+        if feed is None:
+            return {"error": f"{self.label} returned JSON that is not a feed"}
+        llm_cache.set(cache_key, feed)
+        return feed
+    
+    def extract_content_batch(self, jobs) -> list:
+        """
+        Pack up to max_batch_sites sites into one request so the static
+        instructions are sent once per batch instead of once per site
+        Falls back to one request per site if the feeds come back misaligned
+        """
+        if self.max_batch_sites <= 1:
+            return self.extract_content_many(jobs)
+        
+        results = [None] * len(jobs)
+        pending = []
+        for index, (url, html_content) in enumerate(jobs):
+            truncated_content, cache_key, result = self._prepare(url, html_content)
+            if result is not None:
+                results[index] = result
+            else:
+                pending.append((index, url, truncated_content, cache_key))
+        
+        for start in range(0, len(pending), self.max_batch_sites):
+            chunk = pending[start:start + self.max_batch_sites]
+            prompt = f"TODAY: {date.today().isoformat()}\n\nINPUTS:\n\n" + "\n\n".join(
+                _BATCH_SITE_TEMPLATE.format_map({"index": n, "url": url, "content": content})
+                for n, (_, url, content, _) in enumerate(chunk, 1)
+            )
+            batch_result = self._complete(_FEED_INSTRUCTIONS + _BATCH_INSTRUCTIONS, prompt, "feeds", BATCH_FEED_SCHEMA,
+                                          self.max_output_tokens * len(chunk))
+            feeds = batch_result.get("feeds") if isinstance(batch_result, dict) else None
             
-            if response.status_code == 200:
-                result = response.json()
-                content = result['choices'][0]['message']['content']
-                print(f"OpenAI raw content preview: {content[:200]}...")
-                
-                try:
-                    parsed_result = json.loads(content)
-                    print(f"OpenAI parsed result keys: {parsed_result.keys()}")
-                    return parsed_result
-                except json.JSONDecodeError as e:
-                    print(f"Failed to parse OpenAI JSON: {e}")
-                    return {"error": f"Failed to parse AI response: {str(e)}"}
+            if isinstance(batch_result, dict) and "error" in batch_result:
+                for index, _, _, _ in chunk:
+                    results[index] = batch_result
+            elif not isinstance(feeds, list) or len(feeds) != len(chunk):
+                logger.warning("%s batch returned %s feeds for %d sites, retrying one by one",
+                               self.label, len(feeds) if isinstance(feeds, list) else "no", len(chunk))
+                for index, url, _, _ in chunk:
+                    results[index] = self.extract_content(*jobs[index])
             else:
-                error_text = response.text[:500]
-                print(f"OpenAI API error {response.status_code}: {error_text}")
-                return {"error": f"OpenAI API error: {response.status_code}"}
-                
-        except requests.RequestException as e:
-            print(f"OpenAI request exception: {e}")
-            return {"error": f"OpenAI request failed: {str(e)}"}
-        except Exception as e:
-            print(f"OpenAI unexpected error: {e}")
-            return {"error": f"OpenAI unexpected error: {str(e)}"}
+                for (index, _, _, cache_key), feed in zip(chunk, feeds):
+                    feed = _normalize_feed(feed)
+                    if feed is None:
+                        feed = {"error": f"{self.label} returned JSON that is not a feed"}
+                    llm_cache.set(cache_key, feed)
+                    results[index] = feed
+        
+        return results
 
-class GeminiProvider(AIProvider):
-    def __init__(self, api_key: str):
-        self.api_key = api_key
-        self.base_url = "https://generativelanguage.googleapis.com/v1beta/models/gemini-2.5-flash:generateContent"
+class OpenAIProvider(HTTPLLMProvider):
+    name = "openai"
+    label = "OpenAI"
+    model = os.environ.get("OPENAI_MODEL", "gpt-4o-mini")
+    base_url = "https://api.openai.com/v1/chat/completions"
+    # Combined output of 4 feeds stays within the model's output limit
+    max_batch_sites = 4
     
-    def extract_content(self, url: str, html_content: str) -> dict:
-        # Limitar o tamanho do conteúdo para evitar timeouts
-        max_content_length = 8000  # Aumentar para 8000 caracteres para capturar mais conteúdo
-        truncated_content = html_content[:max_content_length]
-        if len(html_content) > max_content_length:
-            truncated_content += "... [conteúdo truncado para evitar timeout]"
-            print(f"Content truncated from {len(html_content)} to {max_content_length} chars")
-        
-        prompt = f"""
-        You are an expert web scraper. Analyze this website and extract individual news articles, blog posts, or content items.
-
-        Website URL: {url}
-        Content: {truncated_content}
-
-        CRITICAL INSTRUCTIONS - READ CAREFULLY:
-        The content above contains structured ARTICLE blocks with:
-        - TITLE: Article title
-        - LINK: **EXACT article URL** (already extracted from HTML <a href>)
-        - DATE: Publication date
-        - IMAGE: **EXACT image URL** (already extracted from HTML <img src>)
-        - CONTENT: Article preview text
-        
-        YOUR JOB:
-        1. Parse these ARTICLE blocks
-        2. **USE THE EXACT LINK VALUES** - DO NOT create or modify URLs
-        3. **USE THE EXACT IMAGE VALUES** - DO NOT create or modify image URLs
-        4. **USE THE EXACT DATE VALUES** - format as YYYY-MM-DD
-        5. Improve the DESCRIPTION by expanding on the CONTENT provided
-        6. DO NOT hallucinate or fabricate any URLs or data
-        
-        INSTRUCTIONS:
-        1. Look for MULTIPLE different ARTICLE blocks in the content
-        2. Each item should have a unique title and detailed description (100-200 words)
-        3. **EXTRACT EXACT LINKS** - Use LINK value from ARTICLE block, do not create new URLs
-        4. **EXTRACT EXACT IMAGES** - Use IMAGE value from ARTICLE block, do not create new image URLs
-        5. **EXTRACT EXACT DATES** - Use DATE value from ARTICLE block, format as YYYY-MM-DD
-        6. Focus on RECENT articles from 2024-2025
-        7. SORT articles by date DESC (newest first)
-        
-        CRITICAL LINK GUIDELINES:
-        - **NEVER CREATE OR GUESS ARTICLE URLs**
-        - Use the LINK value exactly as provided in each ARTICLE block
-        - If LINK is empty, use base URL: {url}
-        
-        CRITICAL IMAGE GUIDELINES:
-        - **NEVER CREATE OR GUESS IMAGE URLs**  
-        - Use the IMAGE value exactly as provided in each ARTICLE block
-        - If IMAGE is empty, leave as empty string ""
-        
-        CRITICAL DATE GUIDELINES:
-        - Use the DATE value from each ARTICLE block
-        - Format as YYYY-MM-DD
-        - If DATE is empty, use current date: 2025-10-30
-
-        For a blog/news site like this, look for:
-        - Article headlines
-        - Post titles
-        - News items
-        - Blog entries
-        - Event announcements
-
-        Return a JSON object with this exact structure:
-        {{
-            "title": "Website/Section Title",
-            "description": "Brief description of the website/section",
-            "items": [
-                {{
-                    "title": "Article Title",
-                    "link": "https://full-url-to-article",
-                    "description": "Detailed 100-200 word description explaining what this article covers, its main points, and why readers would find it interesting or valuable.",
-                    "image": "https://url-to-article-image",
-                    "pubDate": "2024-10-01"
-                }}
-            ]
-        }}
-
-        Make sure each article has a UNIQUE title and comprehensive description.
-        """
-        
-        headers = {
-            "Content-Type": "application/json",
+    def _response_format(self, schema_name: str, schema: dict) -> dict:
+        return {
+            "type": "json_schema",
+            "json_schema": {"name": schema_name, "schema": schema, "strict": True}
         }
-        
+    
+    def _build_headers(self):
+        return {
+            "Authorization": f"Bearer {self.api_key}"
+        }
+    
+    def _build_request(self, instructions: str, prompt: str, schema_name: str, schema: dict, max_tokens: int):
+        data = {
+            "model": self.model,
+            "messages": [
+                {"role": "system", "content": instructions},
+                {"role": "user", "content": prompt}
+            ],
+            "temperature": 0.3,
+            "max_tokens": max_tokens,
+            "response_format": self._response_format(schema_name, schema),
+            "stream": True
+        }
+        return self.base_url, self._headers, data
+    
+    def _event_text(self, event: dict) -> str:
+        if not event.get('choices'):
+            return ''
+        return event['choices'][0]['delta'].get('content') or ''
+
+class GeminiProvider(HTTPLLMProvider):
+    name = "gemini"
+    label = "Gemini"
+    model = os.environ.get("GEMINI_MODEL", "gemini-2.5-flash")
+    base_url = "https://generativelanguage.googleapis.com/v1beta/models/{model}:streamGenerateContent"
+    max_content_tokens = 2000
+    truncation_marker = "... [conteúdo truncado para evitar timeout]"
+    prompt_template = _GEMINI_PROMPT_TEMPLATE
+    
+    def __init__(self, api_key: str, model: str = None):
+        super().__init__(api_key, model)
+        # Gemini authenticates through the query string instead of headers
+        self._request_url = f"{self.base_url.format(model=self.model)}?alt=sse&key={self.api_key}"
+    
+    def _build_request(self, instructions: str, prompt: str, schema_name: str, schema: dict, max_tokens: int):
         data = {
+            "systemInstruction": {
+                "parts": [{"text": instructions}]
+            },
             "contents": [{
+                "role": "user",
                 "parts": [{"text": prompt}]
-            }]
+            }],
+            # No maxOutputTokens: on 2.5 models thinking tokens share that
+            # budget, so a cap can cut the JSON off before it is written
+            "generationConfig": {
+                "responseMimeType": "application/json",
+                "responseSchema": _GEMINI_FEED_SCHEMA if schema is FEED_SCHEMA else _gemini_schema(schema)
+            }
         }
-        
-        try:
-            # Retry logic for timeout errors
-            max_retries = 2
-            retry_count = 0
-            last_error = None
-            
-            while retry_count <= max_retries:
-                try:
-                    # Aumentar timeout para 60s
-                    response = requests.post(f"{self.base_url}?key={self.api_key}", headers=headers, json=data, timeout=60)
-                    
-                    if response.status_code == 200:
-                        result = response.json()
-                        content = result['candidates'][0]['content']['parts'][0]['text']
-                        
-                        # Clean up the response
-                        content = content.strip()
-                        if content.startswith('```json'):
-                            content = content[7:]
-                        if content.endswith('```'):
-                            content = content[:-3]
-                        content = content.strip()
-                        
-                        try:
-                            return json.loads(content)
-                        except json.JSONDecodeError as e:
-                            return {"error": f"Failed to parse Gemini response: {str(e)}"}
-                    
-                    elif response.status_code == 503:
-                        # 503 Service Unavailable - modelo sobrecarregado, tentar novamente
-                        retry_count += 1
-                        print(f"⚠️ Gemini sobrecarregado (503), tentativa {retry_count} de {max_retries + 1}...")
-                        if retry_count <= max_retries:
-                            import time
-                            time.sleep(3)  # Esperar 3s antes de tentar novamente (mais que timeout)
-                            continue
-                        else:
-                            error_text = response.text[:500]
-                            return {"error": f"Gemini API error: {response.status_code} - {error_text}"}
-                    
-                    else:
-                        error_text = response.text[:500]
-                        return {"error": f"Gemini API error: {response.status_code} - {error_text}"}
-                
-                except requests.exceptions.ReadTimeout as e:
-                    retry_count += 1
-                    last_error = e
-                    print(f"Gemini timeout, tentativa {retry_count} de {max_retries + 1}...")
-                    if retry_count <= max_retries:
-                        import time
-                        time.sleep(2)  # Esperar 2s antes de tentar novamente
-                        continue
-                    else:
-                        return {"error": f"Gemini timeout após {max_retries + 1} tentativas. Tente usar menos conteúdo ou outro provider."}
-                
-                except requests.exceptions.RequestException as e:
-                    return {"error": f"Gemini request error: {str(e)}"}
-                    
-        except Exception as e:
-            return {"error": f"Gemini error: {str(e)}"}
-
-class ClaudeProvider(AIProvider):
-    def __init__(self, api_key: str):
-        self.api_key = api_key
-        self.base_url = "https://api.anthropic.com/v1/messages"
+        return self._request_url, self._headers, data
     
-    def extract_content(self, url: str, html_content: str) -> dict:
-        # Limitar o tamanho do conteúdo
-        max_content_length = 6000  # Aumentar para 6000 caracteres
-        truncated_content = html_content[:max_content_length]
-        if len(html_content) > max_content_length:
-            print(f"Claude: Content truncated from {len(html_content)} to {max_content_length} chars")
-        
-        prompt = f"""
-        Extract RSS feed information from this website content:
-        URL: {url}
-        
-        HTML Content: {truncated_content}...
-        
-        CRITICAL - The content contains structured ARTICLE blocks with TITLE, LINK, DATE, IMAGE already extracted.
-        **YOUR JOB: Use these EXACT values, do not create new URLs or data.**
-        
-        Return a JSON with:
-        - title: Main title of the website/page
-        - description: Brief description of the content
-        - items: Array of up to 10 articles/posts with detailed information
-        
-        For each article:
-        - title: Clear, descriptive title
-        - link: **USE EXACT LINK from ARTICLE block** (do not create new URLs!)
-        - description: Detailed summary in 100-200 words
-        - image: **USE EXACT IMAGE from ARTICLE block** (do not create new image URLs!)
-        - pubDate: **USE EXACT DATE from ARTICLE block** (format as YYYY-MM-DD)
-        
-        CRITICAL RULES:
-        - DO NOT create or guess article URLs - use LINK from ARTICLE blocks
-        - DO NOT create or guess image URLs - use IMAGE from ARTICLE blocks  
-        - DO NOT create or guess dates - use DATE from ARTICLE blocks
-        - If LINK/IMAGE/DATE is empty, use empty string "" or current date
-        
-        CRITICAL SORTING:
-        *** MUST sort articles by pubDate in DESCENDING order (newest FIRST, oldest LAST) ***
-        *** Article with date 2025-10-28 MUST come BEFORE article with date 2025-10-14 ***
-        *** DO NOT return articles in the order they appear in HTML - SORT BY DATE! ***
-        
-        IMPORTANT: 
-        1. Sort articles by pubDate DESC (newest first) - THIS IS MANDATORY!
+    def _event_text(self, event: dict) -> str:
+        return ''.join(
+            part.get('text', '')
+            for candidate in event.get('candidates', [])[:1]
+            for part in candidate.get('content', {}).get('parts', [])
+        )
 
-        2. Focus on RECENT articles from 2024-2025
-        3. Extract actual content, not navigation or ads
-        """
-        
-        headers = {
+class ClaudeProvider(HTTPLLMProvider):
+    name = "claude"
+    label = "Claude"
+    # Haiku is several times faster per token than Sonnet and plenty for
+    # structural extraction
+    model = os.environ.get("CLAUDE_MODEL", "claude-3-5-haiku-latest")
+    base_url = "https://api.anthropic.com/v1/messages"
+    
+    def _build_headers(self):
+        return {
             "x-api-key": self.api_key,
-            "Content-Type": "application/json",
             "anthropic-version": "2023-06-01"
         }
-        
+    
+    def _build_request(self, instructions: str, prompt: str, schema_name: str, schema: dict, max_tokens: int):
         data = {
-            "model": "claude-3-sonnet-20240229",
-            "max_tokens": 2000,
-            "messages": [{"role": "user", "content": prompt}]
+            "model": self.model,
+            "max_tokens": max_tokens,
+            "system": [{
+                "type": "text",
+                "text": instructions,
+                "cache_control": {"type": "ephemeral"}
+            }],
+            "messages": [{"role": "user", "content": prompt}],
+            # Forced tool use makes Claude return the result as tool input
+            # validated against the schema instead of free text
+            "tools": [{
+                "name": f"publish_{schema_name}",
+                "description": "Publish the extracted RSS feed",
+                "input_schema": schema
+            }],
+            "tool_choice": {"type": "tool", "name": f"publish_{schema_name}"},
+            "stream": True
         }
-        
-        try:
-            response = requests.post(self.base_url, headers=headers, json=data, timeout=60)
-            
-            if response.status_code == 200:
-                result = response.json()
-                content = result['content'][0]['text']
-                try:
-                    return json.loads(content)
-                except:
-                    return {"error": "Failed to parse Claude response"}
-            else:
-                return {"error": f"Claude API error: {response.status_code}"}
-                
-        except Exception as e:
-            return {"error": f"Claude error: {str(e)}"}
+        return self.base_url, self._headers, data
+    
+    def _event_text(self, event: dict) -> str:
+        # Tool input arrives as partial JSON fragments
+        if event.get('type') != 'content_block_delta':
+            return ''
+        return event['delta'].get('partial_json', '')
 
-class PerplexityProvider(AIProvider):
-    def __init__(self, api_key: str):
-        self.api_key = api_key
-        self.base_url = "https://api.perplexity.ai/chat/completions"
+class PerplexityProvider(OpenAIProvider):
+    """Perplexity speaks the OpenAI chat completions protocol"""
+    name = "perplexity"
+    label = "Perplexity"
+    model = os.environ.get("PERPLEXITY_MODEL", "sonar")
+    base_url = "https://api.perplexity.ai/chat/completions"
+    max_batch_sites = 1
     
-    def extract_content(self, url: str, html_content: str) -> dict:
-        # Limitar o tamanho do conteúdo
-        max_content_length = 6000  # Aumentar para 6000 caracteres
-        truncated_content = html_content[:max_content_length]
-        if len(html_content) > max_content_length:
-            print(f"Perplexity: Content truncated from {len(html_content)} to {max_content_length} chars")
-        
-        prompt = f"""
-        Extract RSS feed information from this website content:
-        URL: {url}
-        
-        HTML Content: {truncated_content}...
-        
-        CRITICAL - The content contains structured ARTICLE blocks with TITLE, LINK, DATE, IMAGE already extracted.
-        **YOUR JOB: Use these EXACT values, do not create new URLs or data.**
-        
-        Return a JSON with:
-        - title: Main title of the website/page
-        - description: Brief description of the content
-        - items: Array of up to 10 articles/posts with detailed information
-        
-        For each article:
-        - title: Clear, descriptive title
-        - link: **USE EXACT LINK from ARTICLE block** (do not create new URLs!)
-        - description: Detailed summary in 100-200 words
-        - image: **USE EXACT IMAGE from ARTICLE block** (do not create new image URLs!)
-        - pubDate: **USE EXACT DATE from ARTICLE block** (format as YYYY-MM-DD)
-        
-        CRITICAL RULES:
-        - DO NOT create or guess article URLs - use LINK from ARTICLE blocks
-        - DO NOT create or guess image URLs - use IMAGE from ARTICLE blocks
-        - DO NOT create or guess dates - use DATE from ARTICLE blocks
-        
-        CRITICAL SORTING:
-        *** MUST sort articles by pubDate in DESCENDING order (newest FIRST, oldest LAST) ***
-        *** Article with date 2025-10-28 MUST come BEFORE article with date 2025-10-14 ***
-        *** DO NOT return articles in the order they appear in HTML - SORT BY DATE! ***
-        - If LINK/IMAGE/DATE is empty, use empty string "" or current date
-        
-        IMPORTANT: 
-        1. Sort articles by pubDate DESC (newest first)
-        2. Focus on RECENT articles from 2024-2025
-        3. Extract actual content, not navigation or ads
-        """
-        
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json"
-        }
-        
-        data = {
-            "model": "llama-3.1-sonar-small-128k-online",
-            "messages": [{"role": "user", "content": prompt}],
-            "temperature": 0.3
+    def _response_format(self, schema_name: str, schema: dict) -> dict:
+        return {
+            "type": "json_schema",
+            "json_schema": {"schema": schema}
         }
-        
-        try:
-            response = requests.post(self.base_url, headers=headers, json=data, timeout=60)
+
+def run_hedged(attempts, hedge_after=None, max_in_flight=4):
+    """
+    Run (name, func) extraction attempts in order until one returns a dict
+    without an "error" key; returns (index, result), or (None, last error)
+    The next attempt starts when a running one fails or, with hedge_after
+    set, when the running ones have had no answer for hedge_after seconds
+    (hedge_after=None is plain sequential fallback, 0 starts them all)
+    Losing attempts can't be interrupted and finish in the background
+    """
+    attempts = list(attempts)
+    width = max(1, min(max_in_flight, len(attempts)))
+    executor = ThreadPoolExecutor(max_workers=width)
+    running = {}
+    next_index = 0
+    last_error = {"error": "No attempts to run"}
+    try:
+        while next_index < len(attempts) or running:
+            if next_index < len(attempts) and len(running) < width:
+                logger.debug("Starting %s", attempts[next_index][0])
+                running[executor.submit(attempts[next_index][1])] = next_index
+                next_index += 1
             
-            if response.status_code == 200:
-                result = response.json()
-                content = result['choices'][0]['message']['content']
+            # Wait for an answer, or hedge with the next attempt if there's room
+            can_hedge = hedge_after is not None and next_index < len(attempts) and len(running) < width
+            done, _ = wait(running, timeout=hedge_after if can_hedge else None, return_when=FIRST_COMPLETED)
+            for future in done:
+                i = running.pop(future)
                 try:
-                    return json.loads(content)
-                except:
-                    return {"error": "Failed to parse Perplexity response"}
-            else:
-                return {"error": f"Perplexity API error: {response.status_code}"}
-                
-        except Exception as e:
-            return {"error": f"Perplexity error: {str(e)}"}
+                    result = future.result()
+                except Exception as e:
+                    result = {"error": f"{type(e).__name__}: {str(e)}"}
+                if not isinstance(result, dict):
+                    result = {"error": f"Invalid result type: {type(result).__name__}"}
+                if "error" not in result:
+                    return i, result
+                logger.warning("%s failed: %s", attempts[i][0], result['error'])
+                last_error = result
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+    return None, last_error
 
-def get_ai_provider(provider_name: str, api_key: str) -> AIProvider:
+# Seconds a provider may run before the hedged provider also starts the
+# next one; above typical LLM latency (10-30s) so hedging doesn't pay for
+# two calls on every request. A failure starts the next one right away
+AI_PROVIDER_HEDGE_SECONDS = float(os.environ.get("AI_PROVIDER_HEDGE_SECONDS", 45))
+
+class HedgedAIProvider(AIProvider):
     """
-    Factory function to get the appropriate AI provider
+    Cross-provider fallback ("try OpenAI, else Gemini, ..."): providers run
+    in order through run_hedged, so a slow or failing provider doesn't
+    hold up the next one for a full timeout
     """
-    providers = {
-        "openai": OpenAIProvider,
-        "gemini": GeminiProvider,
-        "claude": ClaudeProvider,
-        "perplexity": PerplexityProvider
-    }
+    name = "hedged"
+    label = "Hedged"
     
-    if provider_name not in providers:
+    def __init__(self, providers, hedge_after=AI_PROVIDER_HEDGE_SECONDS):
+        self.providers = list(providers)
+        self.hedge_after = hedge_after
+    
+    def extract_content(self, url: str, html_content: str) -> dict:
+        if not self.providers:
+            return {"error": "No AI providers configured"}
+        attempts = [
+            (provider.label, lambda provider=provider: provider.extract_content(url, html_content))
+            for provider in self.providers
+        ]
+        _, result = run_hedged(attempts, self.hedge_after, max_in_flight=len(attempts))
+        return result
+
+_PROVIDER_CLASSES = {
+    "openai": OpenAIProvider,
+    "gemini": GeminiProvider,
+    "claude": ClaudeProvider,
+    "perplexity": PerplexityProvider
+}
+
+# Provider instances are reused per (provider, api_key, model) so per-instance
+# state is built once instead of on every request; bounded LRU so rotated or
+# per-request keys can't grow the registry without limit
+_PROVIDERS = OrderedDict()
+_PROVIDERS_MAXSIZE = 16
+_PROVIDERS_LOCK = threading.Lock()
+
+def get_ai_provider(provider_name: str, api_key: str, model: str = None) -> AIProvider:
+    """
+    Factory function to get the appropriate AI provider
+    model overrides the provider's default (also settable per provider
+    through OPENAI_MODEL, GEMINI_MODEL, CLAUDE_MODEL, PERPLEXITY_MODEL)
+    For "hedged", api_key is a list of (provider_name, api_key) pairs in
+    fallback order
+    """
+    if provider_name == HedgedAIProvider.name:
+        if isinstance(api_key, str):
+            raise ValueError("The hedged provider takes (provider, api_key) pairs")
+        return HedgedAIProvider(get_ai_provider(name, key, model) for name, key in api_key)
+    if provider_name not in _PROVIDER_CLASSES:
         raise ValueError(f"Unsupported AI provider: {provider_name}")
     
-    return providers[provider_name](api_key)
\ No newline at end of file
+    key = (provider_name, api_key, model)
+    with _PROVIDERS_LOCK:
+        provider = _PROVIDERS.get(key)
+        if provider is None:
+            provider = _PROVIDER_CLASSES[provider_name](api_key, model)
+            _PROVIDERS[key] = provider
+            if len(_PROVIDERS) > _PROVIDERS_MAXSIZE:
+                _PROVIDERS.popitem(last=False)
+        else:
+            _PROVIDERS.move_to_end(key)
+    return provider
@@ -1,67 +1,303 @@
 from flask import Flask, request, jsonify, Response
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
 import requests
-from requests.adapters import HTTPAdapter
-from requests.packages.urllib3.util.retry import Retry
+import hashlib
 import json
-from bs4 import BeautifulSoup
-from ai_providers import get_ai_provider
+import re
+from lxml import etree, html as lxml_html
+from ai_providers import get_ai_provider, run_hedged
 from database import DatabaseManager
 from rss_generator import generate_rss_xml, get_rss_link
 from scheduler import get_scheduler
 from config_manager import ConfigManager
 from smart_scraper import scrape_with_patterns
+from ttl_cache import TTLCache
+from page_fetch import create_session, read_capped
 import threading
 import time
+import uuid
+import sys
+import logging
+import os
+from collections import OrderedDict
 from datetime import datetime
+from functools import lru_cache
+from urllib.parse import urljoin, urlparse
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed, TimeoutError as FuturesTimeoutError
+from importlib import metadata
+
+# Log level comes from LOG_LEVEL (default WARNING), so debug logging in the
+# generate pipeline and ai_providers costs only a level check in production
+logging.basicConfig(
+    level=os.environ.get("LOG_LEVEL", "WARNING").upper(),
+    format="%(asctime)s %(levelname)s %(name)s: %(message)s"
+)
+logger = logging.getLogger(__name__)
 
 # Try to import cloudscraper for bypassing Cloudflare
 try:
     import cloudscraper
     CLOUDSCRAPER_AVAILABLE = True
-    print("✓ cloudscraper available - can bypass Cloudflare protection")
+    logger.info("✓ cloudscraper available - can bypass Cloudflare protection")
 except ImportError:
     CLOUDSCRAPER_AVAILABLE = False
-    print("✗ cloudscraper not available - install with: pip install cloudscraper")
+    logger.warning("✗ cloudscraper not available - install with: pip install cloudscraper")
+
+# Try to import orjson for faster JSON responses
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+class ORJSONProvider(DefaultJSONProvider):
+    """
+    Flask JSON provider serializing and parsing with orjson, keeping the
+    default provider's output (sorted keys, dates through default())
+    """
+    ORJSON_OPTIONS = orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME if ORJSON_AVAILABLE else 0
+
+    def dumps(self, obj, **kwargs):
+        # jsonify only ever passes indent/separators; anything else goes
+        # through the stdlib implementation
+        if set(kwargs) - {'indent', 'separators'}:
+            return super().dumps(obj, **kwargs)
+        option = self.ORJSON_OPTIONS
+        if kwargs.get('indent'):
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=self.default, option=option).decode('utf-8')
+
+    def response(self, *args, **kwargs):
+        """jsonify(): orjson's bytes go straight into the response body (no str round trip)"""
+        obj = self._prepare_response_obj(args, kwargs)
+        option = self.ORJSON_OPTIONS | orjson.OPT_APPEND_NEWLINE
+        if (self.compact is None and self._app.debug) or self.compact is False:
+            option |= orjson.OPT_INDENT_2
+        return self._app.response_class(
+            orjson.dumps(obj, default=self.default, option=option),
+            mimetype=self.mimetype
+        )
+
+    def loads(self, s, **kwargs):
+        # Used by request.get_json(); orjson's JSONDecodeError subclasses the
+        # stdlib one, so malformed bodies still get Flask's 400 response
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+# Try to import flask-compress for gzip/brotli API responses
+try:
+    from flask_compress import Compress
+    COMPRESS_AVAILABLE = True
+except ImportError:
+    COMPRESS_AVAILABLE = False
 
 app = Flask(__name__)
+if ORJSON_AVAILABLE:
+    app.json = ORJSONProvider(app)
 CORS(app)
+if COMPRESS_AVAILABLE:
+    # Feed listings and RSS XML compress 5-10x; small bodies aren't worth it
+    app.config.update(
+        COMPRESS_MIMETYPES=['application/json', 'application/rss+xml', 'application/xml'],
+        COMPRESS_LEVEL=5,
+        COMPRESS_BR_LEVEL=4,
+        COMPRESS_MIN_SIZE=1024
+    )
+    Compress(app)
 db = DatabaseManager("/app/data/feeds.db")
 config_manager = ConfigManager()
 scheduler = get_scheduler(db)
 
-# Create a session with retry strategy
-def create_session():
-    session = requests.Session()
-    retry = Retry(
-        total=3,
-        read=3,
-        connect=3,
-        backoff_factor=0.3,
-        status_forcelist=(500, 502, 504)
-    )
-    adapter = HTTPAdapter(max_retries=retry)
-    session.mount('http://', adapter)
-    session.mount('https://', adapter)
-    return session
+# Supported AI providers (ordered for listing, frozenset for membership checks)
+PROVIDERS = ('openai', 'gemini', 'claude', 'perplexity')
+VALID_PROVIDERS = frozenset(PROVIDERS)
+
+# A feed can also use "hedged": every provider with a saved key, in
+# PROVIDERS order, each one falling back to the next (see HedgedAIProvider).
+# It has no keys of its own, so it's not a VALID_PROVIDERS key store
+HEDGED_PROVIDER = 'hedged'
+FEED_PROVIDERS = frozenset(PROVIDERS + (HEDGED_PROVIDER,))
+
+def saved_api_key(ai_provider):
+    """
+    Saved API key for ai_provider; for "hedged", the (provider, api_key)
+    pairs of every provider with a saved key (None if there are none)
+    """
+    if ai_provider == HEDGED_PROVIDER:
+        credentials = []
+        for name in PROVIDERS:
+            key = config_manager.get_api_key(name)
+            if key:
+                credentials.append((name, key))
+        return credentials or None
+    return config_manager.get_api_key(ai_provider)
+
+# One pooled session for all page fetches, so repeat visits to a site reuse
+# keep-alive connections and TLS sessions. Like every create_session()
+# session it keeps no cookies, so a saved login's rotated cookies are never
+# replayed on later anonymous fetches
+http_session = create_session()
+
+# Cloudscraper instances are reused per browser profile: they keep their
+# connection pool and any solved Cloudflare clearance cookies. Fetches that
+# send saved-login cookies get a private throwaway scraper instead, so the
+# cookies the site sets in reply never reach the shared jars
+_scrapers = {}
+_scrapers_lock = threading.Lock()
+
+def get_scraper(browser, platform, private=False):
+    if private:
+        return cloudscraper.create_scraper(
+            browser={'browser': browser, 'platform': platform, 'desktop': True}
+        )
+    with _scrapers_lock:
+        scraper = _scrapers.get((browser, platform))
+        if scraper is None:
+            scraper = cloudscraper.create_scraper(
+                browser={
+                    'browser': browser,
+                    'platform': platform,
+                    'desktop': True
+                }
+            )
+            _scrapers[(browser, platform)] = scraper
+        return scraper
+
+def _close_response(future):
+    """Done-callback releasing the connection of a streamed response nobody will read"""
+    if not future.cancelled() and future.exception() is None:
+        future.result().close()
+
+# Fetch strategies run concurrently in tiers of this size (in priority
+# order), so a site that only answers to a later strategy doesn't pay for
+# every earlier failure one after another
+FETCH_TIER_SIZE = 3
+
+def race_fetch_strategies(strategies, on_forbidden=None):
+    """
+    Race (name, func) fetch strategies tier by tier and return the first
+    successful response as (response, last_error, last_status)
+    response is None if every strategy failed. on_forbidden is called once
+    for a tier that got a 403 and had no strategy succeed
+    """
+    last_error = None
+    last_status = None
+    for start in range(0, len(strategies), FETCH_TIER_SIZE):
+        tier = strategies[start:start + FETCH_TIER_SIZE]
+        logger.debug("Trying strategies: %s...", ', '.join(name for name, _ in tier))
+        
+        executor = ThreadPoolExecutor(max_workers=len(tier))
+        futures = {executor.submit(func): name for name, func in tier}
+        winner = None
+        stop = False
+        forbidden = False
+        try:
+            for future in as_completed(futures, timeout=30):
+                strategy_name = futures[future]
+                try:
+                    response = future.result()
+                    if response.is_redirect:
+                        # Only strategies that don't follow redirects get here; an
+                        # unfollowed 3xx must not beat the ones that do
+                        raise requests.exceptions.HTTPError(f"{response.status_code} redirect not followed", response=response)
+                    response.raise_for_status()
+                    read_capped(response)
+                    winner = future
+                    logger.info("SUCCESS with '%s' - Status: %s, Size: %s bytes", strategy_name, response.status_code, len(response.content))
+                    return response, last_error, last_status
+                except requests.exceptions.HTTPError as http_err:
+                    if http_err.response is not None:
+                        http_err.response.close()
+                    last_status = http_err.response.status_code if http_err.response is not None else None
+                    logger.warning("FAILED: %s - HTTP %s: %s", strategy_name, last_status, http_err)
+                    last_error = http_err
+                    if last_status == 403:
+                        forbidden = True
+                    elif last_status is not None and last_status >= 400:
+                        stop = True  # Don't retry for other client errors
+                except Exception as req_err:
+                    logger.warning("FAILED: %s - Request error: %s", strategy_name, req_err)
+                    last_error = req_err
+        except FuturesTimeoutError:
+            logger.warning("Strategies timed out: %s", ', '.join((name for name, _ in tier)))
+            last_error = last_error or TimeoutError("Fetch strategies timed out")
+        finally:
+            # Losing strategies can't be interrupted; they finish in the background
+            # and their streamed responses are closed unread
+            for future in futures:
+                if future is not winner:
+                    future.add_done_callback(_close_response)
+            executor.shutdown(wait=False, cancel_futures=True)
+        
+        # Only reached when nothing in the tier succeeded, so a 403 from one
+        # strategy doesn't count against a saved session another one got in with
+        if forbidden and on_forbidden:
+            on_forbidden()
+        if stop:
+            break
+    
+    return None, last_error, last_status
 
-def check_native_rss_feed(url, response_content):
-    """Try to detect if site has native RSS feed"""
+def probe_feed_url(feed_url, user_agent):
+    """Return True if feed_url answers with an RSS/Atom document"""
     try:
-        soup = BeautifulSoup(response_content, 'html.parser')
-        
-        # Look for RSS/Atom feed links in head
-        rss_links = []
-        for link in soup.find_all('link', type=['application/rss+xml', 'application/atom+xml']):
-            href = link.get('href')
-            if href:
-                rss_links.append(href)
-        
-        if rss_links:
-            print(f"Found native RSS feeds: {rss_links}")
-            return rss_links
-    except:
-        pass
+        logger.debug("Checking: %s", feed_url)
+        # Only the first bytes are needed to recognise a feed; servers that
+        # ignore Range answer 200 and we stop reading after 512 bytes anyway
+        feed_response = http_session.get(
+            feed_url,
+            headers={'User-Agent': user_agent, 'Range': 'bytes=0-511'},
+            timeout=5,
+            stream=True
+        )
+        try:
+            if feed_response.status_code not in (200, 206):
+                return False
+            if 'xml' in feed_response.headers.get('content-type', '').lower():
+                return True
+            head = feed_response.raw.read(512, decode_content=True)
+            return b'<rss' in head or b'<feed' in head
+        finally:
+            feed_response.close()
+    except Exception:
+        return False
+
+def find_native_feed(candidates, user_agent):
+    """
+    Probe candidate feed URLs concurrently and return the first one that
+    is a real feed (None if none are), so a blocked site costs one probe
+    timeout instead of one per candidate
+    """
+    if not candidates:
+        return None
+    
+    executor = ThreadPoolExecutor(max_workers=len(candidates))
+    futures = {executor.submit(probe_feed_url, feed_url, user_agent): feed_url for feed_url in candidates}
+    try:
+        for future in as_completed(futures):
+            if future.result():
+                logger.info("Found RSS feed: %s", futures[future])
+                return futures[future]
+        return None
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+# <link type=...> values that announce a native feed
+FEED_LINK_TYPES = frozenset(['application/rss+xml', 'application/atom+xml'])
+
+def check_native_rss_feed(doc):
+    """Try to detect if site has native RSS feed (doc is the parse_html tree)"""
+    # Look for RSS/Atom feed links in head
+    rss_links = [
+        link.get('href') for link in doc.iter('link')
+        if link.get('type') in FEED_LINK_TYPES and link.get('href')
+    ]
+    
+    if rss_links:
+        logger.debug("Found native RSS feeds: %s", rss_links)
+        return rss_links
     return None
 
 @app.route('/api/health', methods=['GET'])
@@ -95,7 +331,7 @@ def after_request(response):
                 data = response.get_data(as_text=True)
                 if data.strip().startswith('{') or data.strip().startswith('['):
                     # It's JSON data without proper Content-Type!
-                    print(f"⚠️ Fixing missing JSON Content-Type for {request.path}")
+                    logger.debug("Fixing missing JSON Content-Type for %s", request.path)
                     response.headers['Content-Type'] = 'application/json'
                     return response
             except:
@@ -105,7 +341,7 @@ def after_request(response):
         # ONLY convert HTML responses that are errors (4xx, 5xx)
         if 'text/html' in content_type and response.status_code >= 400:
             # Convert HTML error response to JSON for consistency
-            print(f"⚠️ WARNING: HTML error response detected for {request.path} (status {response.status_code})")
+            logger.warning("HTML error response detected for %s (status %s)", request.path, response.status_code)
             try:
                 # Try to extract error from HTML
                 html_content = response.get_data(as_text=True)
@@ -126,7 +362,7 @@ def after_request(response):
                 error_response.status_code = response.status_code
                 return error_response
             except Exception as conv_error:
-                print(f"Failed to convert HTML to JSON: {conv_error}")
+                logger.warning("Failed to convert HTML to JSON: %s", conv_error)
                 return response
     return response
 
@@ -144,9 +380,7 @@ def internal_error(error):
 @app.errorhandler(Exception)
 def handle_exception(e):
     # Log the error for debugging
-    print(f"Unhandled exception: {type(e).__name__}: {str(e)}")
-    import traceback
-    traceback.print_exc()
+    logger.exception("Unhandled exception: %s: %s", type(e).__name__, e)
     
     # For non-HTTP exceptions, return JSON error
     return jsonify({
@@ -154,6 +388,51 @@ def handle_exception(e):
         "type": type(e).__name__
     }), 500
 
+# Saved API keys are tried healthiest first. AI_KEY_FALLBACK picks how:
+# "sequential" (default) starts the next key only when one fails, so each
+# generation pays for one call unless a key is broken; "hedged" also starts
+# it when an attempt is still running after AI_KEY_HEDGE_SECONDS (0 starts
+# them all at once), at most AI_KEY_RACE_WIDTH in flight. Hedged attempts
+# that lose still run to completion and are billed
+AI_KEY_FALLBACK = os.environ.get('AI_KEY_FALLBACK', 'sequential')
+AI_KEY_RACE_WIDTH = 4
+AI_KEY_HEDGE_SECONDS = float(os.environ.get('AI_KEY_HEDGE_SECONDS', 45))
+
+# Per (provider, key hash) [successes, failures], to try healthy keys first;
+# keys are hashed so raw secrets aren't held for the life of the process
+_key_stats = {}
+_key_stats_lock = threading.Lock()
+
+def _key_id(ai_provider_name, api_key):
+    return ai_provider_name, hashlib.blake2b(api_key.encode('utf-8'), digest_size=8).hexdigest()
+
+def _key_health(ai_provider_name, api_key):
+    with _key_stats_lock:
+        successes, failures = _key_stats.get(_key_id(ai_provider_name, api_key), (0, 0))
+    return (successes + 1) / (successes + failures + 2)
+
+def _extract_with_key(ai_provider_name, api_key, url, html_content):
+    """One extraction attempt with one key; always returns a dict"""
+    try:
+        provider = get_ai_provider(ai_provider_name, api_key)
+        result = provider.extract_content(url, html_content)
+        
+        # CRITICAL FIX: Check if result is a tuple (should never happen but happens with some providers)
+        if isinstance(result, tuple):
+            logger.warning("Provider %s returned tuple instead of dict! Converting...", ai_provider_name)
+            result = result[0] if result and len(result) > 0 else {"error": "Provider returned empty tuple"}
+        
+        if not isinstance(result, dict):
+            logger.error("Provider %s returned %s instead of dict!", ai_provider_name, type(result).__name__)
+            result = {"error": f"Provider returned invalid type: {type(result).__name__}"}
+    except Exception as e:
+        result = {"error": str(e)}
+    
+    with _key_stats_lock:
+        stats = _key_stats.setdefault(_key_id(ai_provider_name, api_key), [0, 0])
+        stats[1 if "error" in result else 0] += 1
+    return result
+
 def try_ai_with_fallback(ai_provider_name, url, html_content):
     """
     Try AI extraction with multiple API keys if available
@@ -164,116 +443,203 @@ def try_ai_with_fallback(ai_provider_name, url, html_content):
     if not all_keys:
         return {"error": f"No API keys configured for {ai_provider_name}"}, None
     
-    print(f"Trying {len(all_keys)} API key(s) for {ai_provider_name}")
+    logger.debug("Trying %s API key(s) for %s (%s)", len(all_keys), ai_provider_name, AI_KEY_FALLBACK)
     
-    last_error = {"error": "Unknown error"}
-    for i, api_key in enumerate(all_keys):
-        print(f"Attempting with API key #{i+1}/{len(all_keys)}")
-        try:
-            provider = get_ai_provider(ai_provider_name, api_key)
-            result = provider.extract_content(url, html_content)
-            
-            # CRITICAL FIX: Check if result is a tuple (should never happen but happens with some providers)
-            if isinstance(result, tuple):
-                print(f"⚠️ WARNING: Provider {ai_provider_name} returned tuple instead of dict! Converting...")
-                result = result[0] if result and len(result) > 0 else {"error": "Provider returned empty tuple"}
-            
-            if not isinstance(result, dict):
-                print(f"❌ ERROR: Provider {ai_provider_name} returned {type(result).__name__} instead of dict!")
-                last_error = {"error": f"Provider returned invalid type: {type(result).__name__}"}
-                continue
-            
-            if "error" not in result:
-                print(f"✓ Success with API key #{i+1}")
-                return result, api_key
-            else:
-                print(f"✗ API key #{i+1} failed: {result['error']}")
-                last_error = result
-        except Exception as e:
-            print(f"✗ API key #{i+1} exception: {str(e)}")
-            last_error = {"error": str(e)}
+    order = sorted(range(len(all_keys)), key=lambda i: -_key_health(ai_provider_name, all_keys[i]))
+    attempts = [
+        (f"API key #{i + 1}", lambda key=all_keys[i]: _extract_with_key(ai_provider_name, key, url, html_content))
+        for i in order
+    ]
+    hedge_after = AI_KEY_HEDGE_SECONDS if AI_KEY_FALLBACK == 'hedged' else None
+    winner, result = run_hedged(attempts, hedge_after, max_in_flight=AI_KEY_RACE_WIDTH)
+    if winner is not None:
+        logger.info("Success with API key #%s", order[winner] + 1)
+        return result, all_keys[order[winner]]
     
     # All keys failed
-    print(f"❌ All {len(all_keys)} API key(s) failed for {ai_provider_name}")
-    return last_error, None
+    logger.error("All %s API key(s) failed for %s", len(all_keys), ai_provider_name)
+    return result, None
 
-def extract_structured_content_from_html(soup, url):
+def _normalize_ai_result(ai_result):
     """
-    Extract structured content (articles with titles, links, images, dates) from HTML
-    Returns formatted string for AI processing
+    Validate a provider result for generate/reanalyze
+    Returns (result_dict, None), or (None, (error_body, status)) when the
+    result is malformed or an error
+    """
+    if isinstance(ai_result, tuple):
+        logger.warning("ai_result is tuple, extracting first element: %s", ai_result)
+        ai_result = ai_result[0] if ai_result else {"error": "Invalid result format"}
+    
+    if not isinstance(ai_result, dict):
+        logger.error("ai_result is not a dict: %s = %s", type(ai_result), ai_result)
+        return None, ({"error": f"Invalid AI response format: {type(ai_result).__name__}"}, 500)
+    
+    if "error" in ai_result:
+        logger.warning("AI error: %s", ai_result['error'])
+        return None, ({"error": ai_result["error"]}, 500)
+    
+    return ai_result, None
+
+# Class-name keyword patterns, compiled once and matched against the whole
+# class attribute of each candidate element
+ARTICLE_CLASS_RE = re.compile(r'post|article|news|entry|item|story|blog', re.I)
+LIST_ARTICLE_CLASS_RE = re.compile(r'post|article|news|entry|item', re.I)
+DATE_CLASS_RE = re.compile(r'date|time|published|created|updated', re.I)
+WRAPPER_CLASS_RE = re.compile(r'content|main|body|wrapper', re.I)
+WS_RE = re.compile(r'\s+')
+
+# Elements that never hold article content
+NOISE_TAGS = ("script", "style", "nav", "footer", "aside", "form", "button")
+HEADING_TAGS = ('h1', 'h2', 'h3', 'h4', 'h5', 'h6')
+
+MAX_ARTICLES = 15
+# Candidates collected per page: some have no usable title and are skipped,
+# the spare ones fill their place
+MAX_ARTICLE_CANDIDATES = 2 * MAX_ARTICLES
+
+def parse_html(content):
+    """
+    Parse a page straight into an lxml.html tree (no BeautifulSoup wrapper)
+    and drop the noise elements, for the article extraction path
+    """
+    try:
+        doc = lxml_html.document_fromstring(content)
+    except ValueError:
+        # lxml rejects str input carrying an XML encoding declaration
+        doc = lxml_html.document_fromstring(content.encode('utf-8'))
+    etree.strip_elements(doc, *NOISE_TAGS, with_tail=False)
+    return doc
+
+def find_first(element, tags, class_re=None, attr=None):
+    """First descendant with one of tags (optionally matching class_re / having attr)"""
+    for elem in element.iterdescendants(*tags):
+        if attr is not None and elem.get(attr) is None:
+            continue
+        if class_re is not None and not class_re.search(elem.get('class') or ''):
+            continue
+        return elem
+    return None
+
+ARTICLE_SCAN_TAGS = HEADING_TAGS + ('a', 'time', 'span', 'div')
+
+def scan_article(article):
+    """
+    Find an article's first heading, first <a href>, first <time datetime>
+    and first date-classed <time>/<span>/<div> in a single walk over its
+    subtree, stopping once nothing better can turn up
+    Returns (heading, link, time_elem, date_elem), None for what is missing
+    """
+    heading = link = time_elem = date_elem = None
+    for elem in article.iterdescendants(*ARTICLE_SCAN_TAGS):
+        tag = elem.tag
+        if tag in HEADING_TAGS:
+            if heading is None:
+                heading = elem
+        elif tag == 'a':
+            if link is None and elem.get('href') is not None:
+                link = elem
+        elif time_elem is None:
+            if tag == 'time' and elem.get('datetime') is not None:
+                time_elem = elem
+            elif date_elem is None and DATE_CLASS_RE.search(elem.get('class') or ''):
+                date_elem = elem
+        # A <time datetime> always wins over a date-classed element
+        if heading is not None and link is not None and time_elem is not None:
+            break
+    return heading, link, time_elem, date_elem
+
+def find_article_elements(doc, limit=MAX_ARTICLE_CANDIDATES):
+    """
+    Collect <article> elements, then article-like <div>s, then article-like
+    <li>s (in that priority order) with a single walk over the tree
+    <div>/<li> blocks inside an already collected <article> are skipped, they
+    would only repeat that article
+    """
+    found = {'article': [], 'div': [], 'li': []}
+    collected_articles = set()
+    for elem in doc.iter('article', 'div', 'li'):
+        name = elem.tag
+        if name == 'article':
+            found['article'].append(elem)
+            collected_articles.add(elem)
+            if len(found['article']) >= limit:
+                break  # <article> elements alone fill the cap
+            continue
+        # Past the cap a bucket can never make it into the result
+        if len(found[name]) >= limit:
+            continue
+        classes = elem.get('class')
+        if not classes:
+            continue
+        class_re = ARTICLE_CLASS_RE if name == 'div' else LIST_ARTICLE_CLASS_RE
+        if not class_re.search(classes):
+            continue
+        if collected_articles and any(parent in collected_articles for parent in elem.iterancestors('article')):
+            continue
+        found[name].append(elem)
+    
+    return (found['article'] + found['div'] + found['li'])[:limit]
+
+def extract_structured_content_from_html(doc, url):
+    """
+    Extract structured content (articles with titles, links, images, dates) from
+    an lxml.html tree (see parse_html)
+    Returns a list of article dicts (title, link, date, image, content) for
+    AI processing, or the page text if no articles are found
     """
     try:
         # Try to find article elements with common patterns
-        articles = []
-        
-        # Look for article elements
-        articles.extend(soup.find_all(['article']))
+        articles = find_article_elements(doc)
         
-        # Look for divs with article-like classes
-        article_divs = soup.find_all('div', class_=lambda x: x and any(
-            keyword in x.lower() for keyword in ['post', 'article', 'news', 'entry', 'item', 'story', 'blog']
-        ))
-        articles.extend(article_divs)
-        
-        # Look for list items that might be articles
-        li_articles = soup.find_all('li', class_=lambda x: x and any(
-            keyword in x.lower() for keyword in ['post', 'article', 'news', 'entry', 'item']
-        ))
-        articles.extend(li_articles)
-        
-        print(f"Found {len(articles)} total article elements")
+        logger.debug("Found %s article elements", len(articles))
         
         # Build structured content
         structured_content = []
-        base_domain = '/'.join(url.split('/')[:3])  # Get base domain
+        # Relative links resolve against the page URL as a directory, computed once
+        url_prefix = url.rstrip('/') + '/'
         
         if articles:
-            for i, article in enumerate(articles[:15]):  # Limit to first 15
+            for i, article in enumerate(articles):
+                if len(structured_content) >= MAX_ARTICLES:
+                    break
+                
+                # One walk over the article finds the title, link and date elements
+                title_elem, link_elem, time_elem, date_elem = scan_article(article)
+                
                 # Extract title
                 try:
-                    title_elem = article.find(['h1', 'h2', 'h3', 'h4', 'h5', 'h6'])
-                    title = title_elem.get_text().strip() if title_elem else f"Article {i+1}"
+                    title = title_elem.text_content().strip() if title_elem is not None else f"Article {i+1}"
                 except Exception as e:
-                    print(f"  ⚠️ Title extraction error: {e}")
+                    logger.warning("Title extraction error: %s", e)
                     title = f"Article {i+1}"
                 
                 # Extract link
                 try:
-                    link_elem = article.find('a', href=True)
                     link = ""
-                    if link_elem:
-                        href = link_elem['href']
-                        if href.startswith('http'):
-                            link = href
-                        elif href.startswith('/'):
-                            link = base_domain + href
-                        else:
-                            link = url + '/' + href.lstrip('/')
+                    if link_elem is not None:
+                        # Also covers protocol-relative //host/... links
+                        link = urljoin(url_prefix, link_elem.get('href').strip())
                 except Exception as e:
-                    print(f"  ⚠️ Link extraction error: {e}")
+                    logger.warning("Link extraction error: %s", e)
                     link = ""
                 
                 # Extract date
                 try:
                     date_text = ""
-                    time_elem = article.find('time', datetime=True)
-                    if time_elem:
-                        date_text = time_elem.get('datetime', time_elem.get_text().strip())
-                        print(f"  📅 Date extraction: Found <time datetime='{date_text}''>")
+                    if time_elem is not None:
+                        date_text = time_elem.get('datetime')
+                        logger.debug("Date extraction: Found <time datetime='%s''>", date_text)
                     else:
-                        date_elem = article.find(['time', 'span', 'div'], class_=lambda x: x and any(
-                            keyword in str(x).lower() for keyword in ['date', 'time', 'published', 'created', 'updated', 'post-date']
-                        ))
-                        if date_elem:
-                            date_text = date_elem.get_text().strip()
-                            print(f"  📅 Date extraction: Found in {date_elem.name} class='{date_elem.get('class')}': {date_text}")
+                        if date_elem is not None:
+                            date_text = date_elem.text_content().strip()
+                            logger.debug("Date extraction: Found in %s class='%s': %s", date_elem.tag, date_elem.get('class'), date_text)
                         else:
-                            print(f"  ⚠️ Date extraction: NO DATE FOUND in article")
+                            logger.debug("Date extraction: NO DATE FOUND in article")
                 except Exception as e:
-                    print(f"  ⚠️ Date extraction error: {e}")
+                    logger.warning("Date extraction error: %s", e)
                     date_text = ""
                 
-                print(f"Found article {i+1}: {title[:50]}... | Date: {date_text}")
+                logger.debug("Found article %s: %s... | Date: %s", i + 1, title[:50], date_text)
 
                 
                 # IMAGE EXTRACTION DISABLED - Was causing "Expected JSON response" errors
@@ -282,75 +648,132 @@ def extract_structured_content_from_html(soup, url):
                 
                 # Get content preview
                 try:
-                    content = article.get_text().strip()[:400]  # First 400 chars
+                    content = WS_RE.sub(' ', ' '.join(article.itertext())).strip()[:400]  # First 400 chars
                 except Exception as e:
-                    print(f"  ⚠️ Content extraction error: {e}")
+                    logger.warning("Content extraction error: %s", e)
                     content = ""
                 
                 if title and len(title) > 3:  # Only include if we have a meaningful title
-                    structured_content.append(f"""
-ARTICLE {i+1}:
-TITLE: {title}
-LINK: {link}
-DATE: {date_text}
-IMAGE: {image}
-CONTENT: {content}
----""")
+                    # Sent to the AI as compact JSON, not a text block
+                    structured_content.append({
+                        "title": title,
+                        "link": link,
+                        "date": date_text,
+                        "image": image,
+                        "content": content
+                    })
         
         if structured_content:
-            return "\n".join(structured_content)
+            return structured_content
         else:
             # Fallback to main content
-            main_content = soup.find(['main', 'div'], class_=lambda x: x and any(
-                keyword in x.lower() for keyword in ['content', 'main', 'body', 'wrapper']
-            ))
-            if main_content:
-                return main_content.get_text()
+            main_content = find_first(doc, ('main', 'div'), class_re=WRAPPER_CLASS_RE)
+            if main_content is not None:
+                return main_content.text_content()
             else:
-                return soup.get_text()
+                return doc.text_content()
     
     except Exception as e:
         # If ANY exception occurs during extraction, log it and return basic text
-        print(f"⚠️ ERROR in extract_structured_content_from_html: {type(e).__name__}: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Error in extract_structured_content_from_html: %s: %s", type(e).__name__, e)
         
         # Return safe fallback - just the basic page text
         try:
-            return soup.get_text()
+            return doc.text_content()
         except:
             return "Error extracting content. Please check the URL."
 
+@lru_cache(maxsize=1024)
+def _base_url(url):
+    """scheme://host of a page url, the key site sessions are stored under"""
+    parsed_url = urlparse(url)
+    return f"{parsed_url.scheme}://{parsed_url.netloc}"
+
+# Saved extraction patterns only differ in base_url; everything after it is
+# serialized once
+DEFAULT_PATTERNS_TAIL = json.dumps({
+    'article_patterns': ['article', 'div.post', 'div.entry'],
+    'image_patterns': [{'selector': 'img', 'category': 'general'}]
+})[1:]
+
+def default_extraction_patterns(base_url):
+    """Extraction patterns JSON saved with a feed (same as json.dumps of the full dict)"""
+    return '{"base_url": ' + json.dumps(base_url) + ', ' + DEFAULT_PATTERNS_TAIL
+
+def extract_page_content(html_content, url):
+    """Parse a fetched page and extract its articles (CPU-bound, run on CPU_POOL)"""
+    return extract_structured_content_from_html(parse_html(html_content), url)
+
+# Worker pools: IO_POOL runs whole generate jobs (fetch + LLM round trips,
+# mostly waiting on the network), CPU_POOL bounds concurrent HTML parsing
+IO_POOL = ThreadPoolExecutor(max_workers=int(os.environ.get('GENERATE_WORKERS', 16)), thread_name_prefix='generate')
+CPU_POOL = ThreadPoolExecutor(max_workers=os.cpu_count() or 2, thread_name_prefix='parse')
+
+# Async generate jobs, in memory: job_id -> {status, result, status_code,
+# created_at, done (Event set when finished, for long polling)}
+GENERATE_JOBS_MAX = 200
+generate_jobs = OrderedDict()
+generate_jobs_lock = threading.Lock()
+
+def _run_generate_job(job_id, data):
+    with generate_jobs_lock:
+        generate_jobs[job_id]['status'] = 'running'
+    try:
+        result, status = run_generate(data)
+    except Exception as e:
+        result, status = {"error": f"Internal error: {str(e)}", "type": type(e).__name__}, 500
+    with generate_jobs_lock:
+        job = generate_jobs[job_id]
+        job.update(status='done', result=result, status_code=status)
+    job['done'].set()
+    logger.info("Generate job %s finished with status %s", job_id, status)
+
+def submit_generate_job(data):
+    """Queue run_generate(data) on IO_POOL and return the job id"""
+    job_id = uuid.uuid4().hex
+    with generate_jobs_lock:
+        generate_jobs[job_id] = {
+            "status": "pending", "result": None, "status_code": None,
+            "created_at": time.time(), "done": threading.Event()
+        }
+        # Forget the oldest finished jobs once over the cap
+        for old_id in list(generate_jobs):
+            if len(generate_jobs) <= GENERATE_JOBS_MAX:
+                break
+            if generate_jobs[old_id]['status'] == 'done':
+                del generate_jobs[old_id]
+    IO_POOL.submit(_run_generate_job, job_id, data)
+    return job_id
+
+def get_installed_versions(packages):
+    """Look up installed package versions (done once at import, they can't change at runtime)"""
+    versions = {}
+    for package in packages:
+        try:
+            versions[package] = metadata.version(package)
+        except metadata.PackageNotFoundError:
+            versions[package] = "NOT INSTALLED"
+    return versions
+
+INSTALLED_PACKAGES = get_installed_versions(['cloudscraper', 'requests', 'beautifulsoup4', 'lxml', 'flask'])
+
 @app.route('/api/diagnostics', methods=['GET'])
 def diagnostics():
     """
     Diagnostic endpoint to check system capabilities
     """
-    import sys
-    import pkg_resources
-    
     diagnostics_info = {
         "python_version": sys.version,
         "cloudscraper_available": CLOUDSCRAPER_AVAILABLE,
-        "installed_packages": {},
+        "installed_packages": dict(INSTALLED_PACKAGES),
         "fetch_strategies": []
     }
     
-    # Check installed packages
-    important_packages = ['cloudscraper', 'requests', 'beautifulsoup4', 'lxml', 'flask']
-    for package in important_packages:
-        try:
-            version = pkg_resources.get_distribution(package).version
-            diagnostics_info["installed_packages"][package] = version
-        except:
-            diagnostics_info["installed_packages"][package] = "NOT INSTALLED"
-    
     # List available fetch strategies
     if CLOUDSCRAPER_AVAILABLE:
         diagnostics_info["fetch_strategies"].append("Cloudscraper (Cloudflare bypass)")
     diagnostics_info["fetch_strategies"].extend([
         "Session with full headers",
-        "Direct request with headers",
         "Simple request"
     ])
     
@@ -365,7 +788,7 @@ def api_info():
         "name": "AI RSS Bridge",
         "version": "1.0.0",
         "description": "Generate RSS feeds from any website using AI",
-        "supported_providers": ["openai", "gemini", "claude", "perplexity"],
+        "supported_providers": list(PROVIDERS) + [HEDGED_PROVIDER],
         "endpoints": {
             "/api/generate": "POST - Generate RSS feed from URL",
             "/api/feeds": "GET - List all generated feeds",
@@ -373,7 +796,7 @@ def api_info():
         },
         "required_fields": {
             "url": "Website URL to generate RSS from",
-            "ai_provider": "AI provider (openai, gemini, claude, perplexity)",
+            "ai_provider": "AI provider (openai, gemini, claude, perplexity, or hedged to fall back across every saved provider)",
             "api_key": "API key for the selected AI provider"
         }
     })
@@ -382,71 +805,143 @@ def api_info():
 def generate_rss():
     """
     Generate RSS feed from website URL using AI
+    With "async": true the work runs on IO_POOL and the response is
+    202 + job_id, to be polled at /api/generate/<job_id>
     """
-    print(f"\n{'='*60}")
-    print(f"=== Generate RSS Request Started ===")
-    print(f"{'='*60}\n")
+    logger.debug("=== Generate RSS Request Started ===")
+    
+    logger.debug("[STEP 1] Parsing request JSON...")
+    data = request.get_json()
+    
+    if not data:
+        logger.warning("No JSON data provided")
+        return jsonify({"error": "No JSON data provided"}), 400
     
+    logger.debug("[STEP 1] ✓ JSON parsed successfully")
+    
+    if data.get('async'):
+        job_id = submit_generate_job(data)
+        logger.info("Queued generate job %s", job_id)
+        return jsonify({
+            "job_id": job_id,
+            "status": "pending",
+            "status_url": f"/api/generate/{job_id}"
+        }), 202
+    
+    result, status = run_generate(data)
+    return jsonify(result), status
+
+# Longest a poll may block with ?wait=<seconds>
+JOB_WAIT_MAX_SECONDS = 60
+
+@app.route('/api/generate/<job_id>', methods=['GET'])
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def get_generate_job(job_id):
+    """
+    Poll a job queued by /api/generate with "async": true
+    ?wait=<seconds> blocks until the job finishes (or the wait runs out)
+    instead of returning 202 right away
+    """
+    with generate_jobs_lock:
+        job = generate_jobs.get(job_id)
+    if job is None:
+        return jsonify({"error": "Job not found"}), 404
+    
+    wait_seconds = request.args.get('wait', type=float)
+    if wait_seconds:
+        job['done'].wait(min(wait_seconds, JOB_WAIT_MAX_SECONDS))
+    
+    with generate_jobs_lock:
+        if job['status'] != 'done':
+            return jsonify({"job_id": job_id, "status": job['status']}), 202
+        result, status = job['result'], job['status_code']
+    
+    return jsonify(dict(result, job_id=job_id, status="done")), status
+
+# Generate runs in progress: (url, ai_provider, api_key) -> Future of
+# (response dict, HTTP status), so duplicate submits share one run
+inflight_generates = {}
+inflight_generates_lock = threading.Lock()
+
+def run_generate(data):
+    """
+    Fetch, extract and analyze data['url'] with AI, then save the feed
+    Returns (response dict, HTTP status). A concurrent call with the same
+    url/provider/key (e.g. a double-clicked Generate) waits for the run
+    already in flight instead of fetching and calling the AI again
+    """
+    key = (data.get('url'), data.get('ai_provider'), data.get('api_key'))
+    with inflight_generates_lock:
+        future = inflight_generates.get(key)
+        leader = future is None
+        if leader:
+            future = inflight_generates[key] = Future()
+    if not leader:
+        logger.info("Waiting for in-flight generate of %s", key[0])
+        return future.result()
+    
+    try:
+        result = _run_generate(data)
+        future.set_result(result)
+        return result
+    except BaseException as e:
+        future.set_exception(e)
+        raise
+    finally:
+        with inflight_generates_lock:
+            inflight_generates.pop(key, None)
+
+def _run_generate(data):
     # GLOBAL try-except to catch ANY error and return JSON
     try:
-        print("[STEP 1] Parsing request JSON...")
-        data = request.get_json()
-        
-        if not data:
-            print("ERROR: No JSON data provided")
-            return jsonify({"error": "No JSON data provided"}), 400
-        
-        print("[STEP 1] ✓ JSON parsed successfully")
-        
-        print("[STEP 1] ✓ JSON parsed successfully")
-        
-        print("[STEP 2] Extracting parameters...")
+        logger.debug("[STEP 2] Extracting parameters...")
         url = data.get('url')
         ai_provider = data.get('ai_provider')
         api_key = data.get('api_key')
         
-        print(f"[STEP 2] URL={url}, Provider={ai_provider}")
+        logger.debug("[STEP 2] URL=%s, Provider=%s", url, ai_provider)
         
         if not url or not ai_provider:
-            print("ERROR: Missing required fields")
-            return jsonify({
+            logger.warning("Missing required fields")
+            return {
                 "error": "Missing required fields",
                 "required": ["url", "ai_provider"],
                 "received": {"url": bool(url), "ai_provider": bool(ai_provider)}
-            }), 400
+            }, 400
         
-        print("[STEP 2] ✓ Parameters validated")
+        logger.debug("[STEP 2] ✓ Parameters validated")
+        base_url = _base_url(url)
         
         # Use saved API key if not provided
         if not api_key:
-            api_key = config_manager.get_api_key(ai_provider)
+            api_key = saved_api_key(ai_provider)
             if not api_key:
-                return jsonify({
+                return {
                     "error": f"No API key found for {ai_provider}",
                     "message": "Please provide api_key in request or save it in config",
                     "config_endpoint": "/api/config/api-keys"
-                }), 400
+                }, 400
         
         # Check if feed already exists
         existing_feed = db.get_feed_by_url(url)
         if existing_feed:
             feed_id = existing_feed['id']
             rss_link = get_rss_link(feed_id)
-            return jsonify({
+            return {
                 "message": "Feed already exists",
                 "feed_id": feed_id,
                 "rss_link": rss_link,
                 "feed_info": existing_feed
-            })
+            }, 200
         
         # Check cache first to avoid being blocked
         cached = db.get_cached_content(url)
         if cached:
-            print(f"=== Using cached content for {url} ===")
-            print(f"Cached at: {cached['cached_at']}, Expires: {cached['expires_at']}")
+            logger.debug("=== Using cached content for %s ===", url)
+            logger.debug("Cached at: %s, Expires: %s", cached['cached_at'], cached['expires_at'])
             html_content = cached['content']
         else:
-            print(f"=== No cache found, fetching {url} ===")
+            logger.debug("=== No cache found, fetching %s ===", url)
             
             # Fetch website content with realistic browser headers
             headers = {
@@ -466,31 +961,36 @@ def generate_rss():
             }
             
             # Check if we have a saved session for this site
-            from urllib.parse import urlparse
-            parsed_url = urlparse(url)
-            base_url = f"{parsed_url.scheme}://{parsed_url.netloc}"
             saved_session = db.get_site_session(base_url)
+            
+            # An expired cache entry with validators allows a conditional GET
+            stale = db.get_cache_validators(url)
+            if stale:
+                if stale['etag']:
+                    headers['If-None-Match'] = stale['etag']
+                if stale['last_modified']:
+                    headers['If-Modified-Since'] = stale['last_modified']
         
             cookies = None
             if saved_session and saved_session.get('logged_in'):
-                print(f"=== Using saved session for {base_url} ===")
-                print(f"Session name: {saved_session.get('site_name')}")
-                print(f"Session last validated: {saved_session.get('last_validated')}")
+                logger.debug("=== Using saved session for %s ===", base_url)
+                logger.debug("Session name: %s", saved_session.get('site_name'))
+                logger.debug("Session last validated: %s", saved_session.get('last_validated'))
                 cookies = saved_session.get('cookies')
                 if cookies:
-                    print(f"Found {len(cookies)} cookies in saved session")
+                    logger.debug("Found %s cookies in saved session", len(cookies))
                 if saved_session.get('headers'):
-                    print(f"Found custom headers in saved session")
+                    logger.debug("Found custom headers in saved session")
                     headers.update(saved_session.get('headers'))
             else:
-                print(f"=== No saved session found for {base_url} ===")
-                print(f"You can add a login session in the 'Login Sessions' tab")
+                logger.debug("=== No saved session found for %s ===", base_url)
+                logger.debug("You can add a login session in the 'Login Sessions' tab")
             
-            print(f"=== Fetching URL: {url} ===")
-            print(f"Cloudscraper available: {CLOUDSCRAPER_AVAILABLE}")
-            print(f"Using saved cookies: {bool(cookies)}")
+            logger.debug("=== Fetching URL: %s ===", url)
+            logger.debug("Cloudscraper available: %s", CLOUDSCRAPER_AVAILABLE)
+            logger.debug("Using saved cookies: %s", bool(cookies))
             if cookies:
-                print(f"🍪 Found {len(cookies)} saved cookies")
+                logger.debug("Found %s saved cookies", len(cookies))
             response = None
             
             # Try multiple strategies to fetch the website
@@ -499,316 +999,204 @@ def generate_rss():
             # Strategy 0: Cloudscraper with saved session cookies (PRIORITY for logged sites)
             if CLOUDSCRAPER_AVAILABLE and cookies and saved_session:
                 def cloudscraper_with_session():
-                    print(f"🔐 Using Cloudscraper WITH saved login session")
-                    scraper = cloudscraper.create_scraper(
-                        browser={
-                            'browser': 'chrome',
-                            'platform': 'windows',
-                            'desktop': True
-                        }
-                    )
-                    # Add ALL cookies from saved session
-                    scraper.cookies.update(cookies)
+                    logger.debug("Using Cloudscraper WITH saved login session")
+                    scraper = get_scraper('chrome', 'windows', private=True)
                     
                     # Add session headers if available
                     session_headers = headers.copy()
                     if saved_session.get('headers'):
                         session_headers.update(saved_session.get('headers'))
                     
-                    return scraper.get(url, headers=session_headers, timeout=20, allow_redirects=True)
+                    # Send ALL cookies from saved session with this request only
+                    return scraper.get(url, headers=session_headers, cookies=cookies, timeout=20, stream=True, allow_redirects=True)
                 strategies.append(("Cloudscraper + Saved Session (logged in)", cloudscraper_with_session))
             
             # Strategy 1: Cloudscraper with Chrome (best for Cloudflare/anti-bot protection)
             if CLOUDSCRAPER_AVAILABLE:
                 def cloudscraper_chrome():
-                    scraper = cloudscraper.create_scraper(
-                        browser={
-                            'browser': 'chrome',
-                            'platform': 'windows',
-                            'desktop': True
-                        }
-                    )
-                    if cookies:
-                        scraper.cookies.update(cookies)
-                    return scraper.get(url, timeout=20, allow_redirects=True)
+                    scraper = get_scraper('chrome', 'windows', private=bool(cookies))
+                    return scraper.get(url, cookies=cookies, timeout=20, stream=True, allow_redirects=True)
                 strategies.append(("Cloudscraper Chrome/Windows", cloudscraper_chrome))
                 
                 # Strategy 1b: Cloudscraper with Firefox (alternative browser)
                 def cloudscraper_firefox():
-                    scraper = cloudscraper.create_scraper(
-                        browser={
-                            'browser': 'firefox',
-                            'platform': 'linux',
-                            'desktop': True
-                        }
-                    )
-                    if cookies:
-                        scraper.cookies.update(cookies)
-                    return scraper.get(url, timeout=20, allow_redirects=True)
+                    scraper = get_scraper('firefox', 'linux', private=bool(cookies))
+                    return scraper.get(url, cookies=cookies, timeout=20, stream=True, allow_redirects=True)
                 strategies.append(("Cloudscraper Firefox/Linux", cloudscraper_firefox))
             
             # Strategy 2: Session with full headers and cookies
             def session_fetch():
-                session = create_session()
-                if cookies:
-                    session.cookies.update(cookies)
-                return session.get(url, headers=headers, timeout=15, allow_redirects=True)
+                return http_session.get(url, headers=headers, cookies=cookies, timeout=15, stream=True, allow_redirects=True)
             strategies.append(("Session with full headers", session_fetch))
             
             # Strategy 3: Session with varied User-Agent (for restrictive sites)
             def varied_session_fetch():
-                session = create_session()
                 varied_headers = headers.copy()
                 varied_headers['User-Agent'] = 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.1 Safari/605.1.15'
-                if cookies:
-                    session.cookies.update(cookies)
-                return session.get(url, headers=varied_headers, timeout=15, allow_redirects=True)
+                return http_session.get(url, headers=varied_headers, cookies=cookies, timeout=15, stream=True, allow_redirects=True)
             strategies.append(("Session with Safari User-Agent", varied_session_fetch))
             
-            # Strategy 4: Direct request with headers and cookies
-            def direct_fetch():
-                return requests.get(url, headers=headers, cookies=cookies, timeout=15, allow_redirects=True)
-            strategies.append(("Direct request with headers", direct_fetch))
-            
-            # Strategy 5: Minimal headers (for over-protective sites)
+            # Strategy 4: Minimal headers (for over-protective sites)
             def minimal_fetch():
                 minimal_headers = {
                     'User-Agent': 'Mozilla/5.0 (X11; Linux x86_64; rv:109.0) Gecko/20100101 Firefox/119.0',
                     'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8'
                 }
-                return requests.get(url, headers=minimal_headers, timeout=15, allow_redirects=True)
+                return http_session.get(url, headers=minimal_headers, timeout=15, stream=True, allow_redirects=True)
             strategies.append(("Minimal headers (Firefox)", minimal_fetch))
             
-            # Strategy 6: Request without redirects (some sites block on redirect)
+            # Strategy 5: Request without redirects (some sites block on redirect)
             def no_redirect_fetch():
-                return requests.get(url, headers=headers, timeout=15, allow_redirects=False)
+                return http_session.get(url, headers=headers, timeout=15, stream=True, allow_redirects=False)
             strategies.append(("No redirects", no_redirect_fetch))
             
-            # Strategy 7: Simple request (last resort)
-            strategies.append(("Simple request", lambda: requests.get(url, timeout=15)))
+            # Strategy 6: Simple request (last resort)
+            strategies.append(("Simple request", lambda: http_session.get(url, timeout=15, stream=True)))
             
-            last_error = None
-            print(f"Will try {len(strategies)} strategies in order:")
-            for i, (name, _) in enumerate(strategies, 1):
-                print(f"  {i}. {name}")
-            print("")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Will try %s strategies, %s at a time:", len(strategies), FETCH_TIER_SIZE)
+                for i, (name, _) in enumerate(strategies, 1):
+                    logger.debug("%s. %s", i, name)
             
-            import time
-            for i, (strategy_name, strategy_func) in enumerate(strategies):
-                # Add small delay between attempts (except first one)
-                if i > 0:
-                    time.sleep(0.5)  # 500ms delay to avoid rate limiting
-                    
-                try:
-                    print(f"▶ Trying strategy: {strategy_name}...")
-                    response = strategy_func()
-                    response.raise_for_status()
-                    print(f"✓ SUCCESS with '{strategy_name}' - Status: {response.status_code}, Size: {len(response.content)} bytes")
-                    break
-                except requests.exceptions.HTTPError as http_err:
-                    status = response.status_code if response else 'N/A'
-                    print(f"✗ FAILED: {strategy_name} - HTTP {status}: {http_err}")
-                    last_error = http_err
-                    if response and response.status_code == 403:
-                        # Check if session expired
-                        if saved_session:
-                            db.mark_session_logged_out(base_url)
-                        continue  # Try next strategy
-                    elif response and response.status_code >= 400:
-                        break  # Don't retry for other client errors
-                except requests.exceptions.RequestException as req_err:
-                    print(f"✗ FAILED: {strategy_name} - Request error: {req_err}")
-                    last_error = req_err
-                    continue
+            def mark_session_expired():
+                # 403 with a saved login usually means the session expired
+                if saved_session:
+                    db.mark_session_logged_out(base_url)
+            
+            response, last_error, last_status = race_fetch_strategies(strategies, on_forbidden=mark_session_expired)
             
-            print(f"\n=== Fetch Result ===")
-            if response is None or response.status_code >= 400:
-                print(f"❌ All strategies failed!")
+            logger.debug("=== Fetch Result ===")
+            if response is None:
                 error_msg = f"Failed to fetch website: {last_error}"
-                if response and response.status_code == 403:
+                if last_status == 403:
                     # Try to find RSS feed automatically
-                    print("🔍 Site blocked, checking for native RSS feed...")
+                    logger.info("Site blocked, checking for native RSS feed...")
+                    site_root = url.rstrip('/')
                     possible_feeds = [
-                        f"{url.rstrip('/')}/feed/",
-                        f"{url.rstrip('/')}/rss/",
-                        f"{url.rstrip('/')}/feed.xml",
-                        f"{url.rstrip('/')}/rss.xml",
+                        f"{site_root}/feed/",
+                        f"{site_root}/rss/",
+                        f"{site_root}/feed.xml",
+                        f"{site_root}/rss.xml",
                         f"{base_url}/feed/",
                         f"{base_url}/rss/"
                     ]
                     
-                    found_feed = None
-                    for feed_url in possible_feeds:
-                        try:
-                            print(f"  Checking: {feed_url}")
-                            feed_response = requests.get(feed_url, headers={'User-Agent': headers['User-Agent']}, timeout=5)
-                            if feed_response.status_code == 200 and ('xml' in feed_response.headers.get('content-type', '').lower() or 
-                                                                      b'<rss' in feed_response.content[:500] or 
-                                                                      b'<feed' in feed_response.content[:500]):
-                                found_feed = feed_url
-                                print(f"  ✓ Found RSS feed: {feed_url}")
-                                break
-                        except:
-                            continue
+                    found_feed = find_native_feed(possible_feeds, headers['User-Agent'])
                     
                     if found_feed:
-                        error_msg = f"⛔ Website blocks automated access, but found official RSS feed!\n\n"
-                        error_msg += f"✅ Use this URL instead: {found_feed}\n\n"
-                        error_msg += "Try generating the feed again with this RSS URL."
+                        parts = [
+                            "⛔ Website blocks automated access, but found official RSS feed!\n\n",
+                            f"✅ Use this URL instead: {found_feed}\n\n",
+                            "Try generating the feed again with this RSS URL."
+                        ]
                     else:
-                        error_msg = "⛔ This website blocks automated access (403 Forbidden).\n\n"
-                        error_msg += "💡 What you can try:\n"
-                        error_msg += "1. Check if the site has an official RSS feed:\n"
-                        error_msg += f"   • {url.rstrip('/')}/feed/\n"
-                        error_msg += f"   • {url.rstrip('/')}/rss/\n"
-                        error_msg += f"   • {url.rstrip('/')}/feed.xml\n"
-                    error_msg += "2. Try a specific article page instead of the homepage\n"
-                    error_msg += "3. Check system capabilities at: /api/diagnostics\n"
+                        parts = [
+                            "⛔ This website blocks automated access (403 Forbidden).\n\n",
+                            "💡 What you can try:\n",
+                            "1. Check if the site has an official RSS feed:\n",
+                            f"   • {site_root}/feed/\n",
+                            f"   • {site_root}/rss/\n",
+                            f"   • {site_root}/feed.xml\n"
+                        ]
+                    parts.append("2. Try a specific article page instead of the homepage\n")
+                    parts.append("3. Check system capabilities at: /api/diagnostics\n")
                     if not CLOUDSCRAPER_AVAILABLE:
-                        error_msg += "4. ⚠️  Cloudscraper NOT installed - rebuild container with: docker-compose up --build\n"
+                        parts.append("4. ⚠️  Cloudscraper NOT installed - rebuild container with: docker-compose up --build\n")
                     else:
-                        error_msg += "4. ✓ Cloudscraper is installed but site still blocks access\n"
-                    error_msg += "\n⚙️ Some sites have very strict protection:\n"
-                    error_msg += "• Use their official RSS feed if available\n"
-                    error_msg += "• Try individual article URLs\n"
+                        parts.append("4. ✓ Cloudscraper is installed but site still blocks access\n")
+                    parts.extend([
+                        "\n⚙️ Some sites have very strict protection:\n",
+                        "• Use their official RSS feed if available\n",
+                        "• Try individual article URLs\n"
+                    ])
                     
                     # Special case suggestions
                     if 'deeplearning.ai' in url.lower():
-                        error_msg += "\n🎓 DeepLearning.AI has very strict anti-bot protection.\n"
-                        error_msg += "Unfortunately, this site blocks automated access even with Cloudscraper.\n\n"
-                        error_msg += "📋 What you can try:\n"
-                        error_msg += "1. Check their official blog RSS feed (if it exists)\n"
-                        error_msg += "2. Subscribe via their newsletter instead\n"
-                        error_msg += "3. Try accessing a specific article URL\n"
-                        error_msg += "4. Use a browser extension to generate RSS\n\n"
-                        error_msg += "⚙️ This is a limitation of web scraping - some sites are intentionally\n"
-                        error_msg += "   designed to prevent automated access.\n"
+                        parts.extend([
+                            "\n🎓 DeepLearning.AI has very strict anti-bot protection.\n",
+                            "Unfortunately, this site blocks automated access even with Cloudscraper.\n\n",
+                            "📋 What you can try:\n",
+                            "1. Check their official blog RSS feed (if it exists)\n",
+                            "2. Subscribe via their newsletter instead\n",
+                            "3. Try accessing a specific article URL\n",
+                            "4. Use a browser extension to generate RSS\n\n",
+                            "⚙️ This is a limitation of web scraping - some sites are intentionally\n",
+                            "   designed to prevent automated access.\n"
+                        ])
                     
-                    error_msg += f"\n📋 Technical: {last_error}"
-                print(f"All strategies failed: {error_msg}")
-                return jsonify({"error": error_msg}), 400
+                    parts.append(f"\n📋 Technical: {last_error}")
+                    error_msg = ''.join(parts)
+                logger.warning("All strategies failed: %s", error_msg)
+                return {"error": error_msg}, 400
             
             # Save successful fetch to cache (24 hours for most sites, 6 hours for blogs)
             cache_hours = 6 if 'blog' in url.lower() or 'news' in url.lower() else 24
-            db.save_cached_content(url, response.text, response.status_code, cache_hours)
-            print(f"✓ Content cached for {cache_hours} hours")
-            html_content = response.text
+            if response.status_code == 304 and stale:
+                logger.debug("Not modified, reusing cached content for %s", url)
+                db.refresh_cached_content(url, cache_hours)
+                html_content = stale['content']
+            else:
+                # response.text decodes (and may sniff the charset) on every
+                # access, decode the capped body only once
+                html_content = response.text
+                db.save_cached_content(
+                    url, html_content, response.status_code, cache_hours,
+                    etag=response.headers.get('ETag'),
+                    last_modified=response.headers.get('Last-Modified')
+                )
+                logger.debug("Content cached for %s hours", cache_hours)
+        
+        # Parse once with lxml; parsing is CPU-bound, run it on the bounded CPU pool
+        try:
+            doc = CPU_POOL.submit(parse_html, html_content).result()
+        except Exception as parse_error:
+            return {"error": f"Failed to parse HTML: {str(parse_error)}"}, 400
         
         # Check for native RSS feeds
-        native_feeds = check_native_rss_feed(url, html_content.encode() if isinstance(html_content, str) else html_content)
+        native_feeds = check_native_rss_feed(doc)
         if native_feeds:
-            print(f"⚠️  Native RSS feeds detected: {native_feeds}")
+            logger.info("Native RSS feeds detected: %s", native_feeds)
             # Continue anyway but log that native feeds exist
         
-        # Parse HTML with better error handling
-        try:
-            # Try lxml first for better performance and HTML handling
-            soup = BeautifulSoup(html_content, 'lxml')
-        except:
-            try:
-                # Fallback to html.parser
-                soup = BeautifulSoup(html_content, 'html.parser')
-            except Exception as parse_error:
-                return jsonify({"error": f"Failed to parse HTML: {str(parse_error)}"}), 400
-        
-        # Remove script and style elements
-        for script in soup(["script", "style", "nav", "footer", "aside", "form", "button"]):
-            script.decompose()
-        
-        # Try to find article elements with common patterns
-        articles = []
-        
-        # Look for article elements
-        articles.extend(soup.find_all(['article']))
-        print(f"Found {len(articles)} <article> elements")
-        
-        # Look for divs with article-like classes
-        article_divs = soup.find_all('div', class_=lambda x: x and any(
-            keyword in x.lower() for keyword in ['post', 'article', 'news', 'entry', 'item', 'story', 'blog']
-        ))
-        articles.extend(article_divs)
-        print(f"Found {len(article_divs)} article-like <div> elements (total: {len(articles)})")
-        
-        # Look for list items that might be articles
-        li_articles = soup.find_all('li', class_=lambda x: x and any(
-            keyword in x.lower() for keyword in ['post', 'article', 'news', 'entry', 'item']
-        ))
-        articles.extend(li_articles)
-        print(f"Found {len(li_articles)} article-like <li> elements (total: {len(articles)})")
-        
-        print("[STEP 7] Extracting structured content...")
-        # Use helper function to extract structured content
-        html_content = extract_structured_content_from_html(soup, url)
-        print("[STEP 7] ✓ Structured content extracted")
+        logger.debug("[STEP 7] Extracting structured content...")
+        html_content = CPU_POOL.submit(extract_structured_content_from_html, doc, url).result()
+        logger.debug("[STEP 7] ✓ Structured content extracted")
         
-        print("[STEP 8] Cleaning whitespace...")
-        # Clean up whitespace
-        html_content = ' '.join(html_content.split())
-        print(f"[STEP 8] ✓ HTML content length: {len(html_content)} characters")
-        print(f"HTML content preview: {html_content[:300]}...")
+        logger.debug("[STEP 8] Cleaning whitespace...")
+        if isinstance(html_content, list):
+            logger.debug("[STEP 8] ✓ %s structured articles", len(html_content))
+            logger.debug("First article: %s", html_content[0])
+        else:
+            # Clean up whitespace
+            html_content = WS_RE.sub(' ', html_content).strip()
+            logger.debug("[STEP 8] ✓ HTML content length: %s characters", len(html_content))
+            logger.debug("HTML content preview: %s...", html_content[:300])
         
-        print("[STEP 9] Calling AI provider...")
+        logger.debug("[STEP 9] Calling AI provider...")
         # Get AI provider and extract content with fallback
-        print(f"AI provider: {ai_provider}")
+        logger.debug("AI provider: %s", ai_provider)
         
         # Try with provided api_key first, then fallback to saved keys
         if api_key:
-            print("Using provided API key")
+            logger.debug("Using provided API key")
             provider = get_ai_provider(ai_provider, api_key)
             ai_result = provider.extract_content(url, html_content)
-            print(f"⚠️ CHECKPOINT 1: After extract_content, type = {type(ai_result)}")
-            if isinstance(ai_result, tuple):
-                print(f"⚠️ CHECKPOINT 1: It's a TUPLE! Content: {ai_result}")
             api_key_used = api_key
         else:
-            print("Using saved API keys with fallback")
+            logger.debug("Using saved API keys with fallback")
             ai_result, api_key_used = try_ai_with_fallback(ai_provider, url, html_content)
-            print(f"⚠️ CHECKPOINT 2: After try_ai_with_fallback, type = {type(ai_result)}")
-            if isinstance(ai_result, tuple):
-                print(f"⚠️ CHECKPOINT 2: It's a TUPLE! Content: {ai_result}")
-        
-        print(f"AI result received: {type(ai_result)}")
-        
-        # Safety check: ensure ai_result is a dict
-        if isinstance(ai_result, tuple):
-            print(f"WARNING: ai_result is tuple, extracting first element: {ai_result}")
-            ai_result = ai_result[0] if ai_result else {"error": "Invalid result format"}
         
-        if not isinstance(ai_result, dict):
-            print(f"ERROR: ai_result is not a dict: {type(ai_result)} = {ai_result}")
-            return jsonify({"error": f"Invalid AI response format: {type(ai_result).__name__}"}), 500
+        ai_result, error = _normalize_ai_result(ai_result)
+        if error:
+            return error
         
-        print(f"✓ ai_result is a valid dict with keys: {list(ai_result.keys())}")
-        
-        if "error" in ai_result:
-            print(f"AI error: {ai_result['error']}")
-            return jsonify({"error": ai_result["error"]}), 500
-        
-        # Extract patterns from the successful AI analysis
-        try:
-            # Simple pattern extraction fallback
-            extraction_patterns = json.dumps({
-                'base_url': '/'.join(url.split('/')[:3]),
-                'article_patterns': ['article', 'div.post', 'div.entry'],
-                'image_patterns': [{'selector': 'img', 'category': 'general'}]
-            })
-        except Exception as pattern_error:
-            print(f"Warning: Pattern extraction failed: {pattern_error}")
-            extraction_patterns = "{}"  # Empty JSON as fallback
+        # Simple pattern extraction fallback
+        extraction_patterns = default_extraction_patterns(base_url)
         
         # Save to database with patterns
         try:
-            print(f"Saving to database...")
-            print(f"Extracting title from ai_result type={type(ai_result)}")
-            
-            # Extra safety: wrap .get() calls in try/except
-            try:
-                title = ai_result.get('title', 'AI Generated Feed')
-                print(f"✓ Title extracted: {title}")
-            except AttributeError as e:
-                print(f"❌ ERROR: ai_result has no .get() method! Type: {type(ai_result)}, Value: {ai_result}")
-                return jsonify({"error": f"Internal error: ai_result is {type(ai_result).__name__}, not dict"}), 500
-            
+            logger.debug("Saving to database...")
+            title = ai_result.get('title', 'AI Generated Feed')
             description = ai_result.get('description', 'Generated by AI RSS Bridge')
             items = ai_result.get('items', [])
             
@@ -821,7 +1209,8 @@ def generate_rss():
                 extraction_patterns=extraction_patterns
             )
             
-            print(f"[STEP 11] ✓ Feed saved with ID: {feed_id}")
+            rss_xml_cache.pop(feed_id)
+            logger.info("[STEP 11] ✓ Feed saved with ID: %s", feed_id)
             rss_link = get_rss_link(feed_id)
             
             result = {
@@ -833,45 +1222,36 @@ def generate_rss():
                 "items_count": len(ai_result.get('items', []))
             }
             
-            print(f"[STEP 12] Returning success result...")
-            print(f"{'='*60}")
-            print(f"=== SUCCESS - Feed Generated ===")
-            print(f"{'='*60}\n")
-            return jsonify(result)
+            logger.debug("[STEP 12] Returning success result...")
+            logger.debug("=== SUCCESS - Feed Generated ===")
+            return result, 200
             
         except Exception as db_error:
-            print(f"Database error: {db_error}")
-            import traceback
-            traceback.print_exc()
-            return jsonify({"error": f"Failed to save feed: {str(db_error)}"}), 500
+            logger.exception("Database error: %s", db_error)
+            return {"error": f"Failed to save feed: {str(db_error)}"}, 500
             
     except requests.RequestException as e:
-        print(f"Request error: {e}")
-        return jsonify({"error": f"Failed to fetch website: {str(e)}"}), 400
+        logger.warning("Request error: %s", e)
+        return {"error": f"Failed to fetch website: {str(e)}"}, 400
     except AttributeError as e:
-        print(f"❌ ATTRIBUTE ERROR in generate_rss: {str(e)}")
-        import traceback
-        print("Full traceback:")
-        traceback.print_exc()
+        logger.exception("AttributeError in generate_rss: %s", e)
         
         # This is the tuple error - let's provide detailed info
         error_msg = f"Internal error: {str(e)}"
         if "'tuple' object has no attribute" in str(e):
             error_msg = "Internal error: AI provider returned invalid format (tuple instead of dict). This is a bug."
         
-        return jsonify({
+        return {
             "error": error_msg,
             "type": "AttributeError",
             "details": "Please report this error with the URL you tried to convert"
-        }), 500
+        }, 500
     except Exception as e:
-        print(f"Unexpected error in generate_rss: {type(e).__name__}: {str(e)}")
-        import traceback
-        traceback.print_exc()
-        return jsonify({
+        logger.exception("Unexpected error in generate_rss: %s: %s", type(e).__name__, e)
+        return {
             "error": f"Internal error: {str(e)}", 
             "type": type(e).__name__
-        }), 500
+        }, 500
 
 @app.route('/api/feeds', methods=['GET'])
 def list_feeds():
@@ -879,10 +1259,11 @@ def list_feeds():
     List all generated RSS feeds with their items
     """
     feeds = db.get_all_feeds()
+    # Include items for each feed, fetched in a single query
+    items_by_feed = db.get_items_for_feeds([feed['id'] for feed in feeds])
     for feed in feeds:
         feed['rss_link'] = get_rss_link(feed['id'])
-        # Include items for each feed
-        feed['items'] = db.get_feed_items(feed['id'])
+        feed['items'] = items_by_feed[feed['id']]
     
     return jsonify({
         "feeds": feeds,
@@ -904,33 +1285,48 @@ def get_feed_items_endpoint(feed_id):
     except Exception as e:
         return jsonify({"error": f"Failed to get feed items: {str(e)}"}), 500
 
+# Rendered RSS XML per feed id, stored with the feed's updated_at
+rss_xml_cache = TTLCache(maxsize=256, ttl=300)
+
+def rss_response(rss_xml, etag=None):
+    """RSS XML response, answered with 304 when the reader's If-None-Match matches etag"""
+    response = Response(rss_xml, mimetype='application/rss+xml')
+    if etag is None:
+        return response
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'max-age=300'
+    return response.make_conditional(request)
+
 @app.route('/api/rss/<int:feed_id>', methods=['GET'])
 def get_rss_xml(feed_id):
     """
     Get RSS XML for specific feed
     """
     # Get feed info
-    feeds = db.get_all_feeds()
-    feed_info = None
-    for feed in feeds:
-        if feed['id'] == feed_id:
-            feed_info = feed
-            break
-    
+    feed_info = db.get_feed_by_id(feed_id)
     if not feed_info:
         return jsonify({"error": "Feed not found"}), 404
     
     # Check if site requires login and session is expired
-    from urllib.parse import urlparse
-    parsed_url = urlparse(feed_info['url'])
-    base_url = f"{parsed_url.scheme}://{parsed_url.netloc}"
+    base_url = _base_url(feed_info['url'])
     saved_session = db.get_site_session(base_url)
+    logged_out = bool(saved_session) and not saved_session.get('logged_in')
+    
+    # Every feed update bumps updated_at, so a cached rendering is only
+    # reused while it matches, and the ETag is derived from it: polling
+    # readers get a 304 until the feed changes
+    etag = None
+    if not logged_out:
+        etag = hashlib.blake2b(f"{feed_id}:{feed_info['updated_at']}".encode(), digest_size=8).hexdigest()
+        cached = rss_xml_cache.get(feed_id)
+        if cached and cached[0] == feed_info['updated_at']:
+            return rss_response(cached[1], etag)
     
     # Get feed items
     items = db.get_feed_items(feed_id)
     
     # If session expired, add logout notification as first item
-    if saved_session and not saved_session.get('logged_in'):
+    if logged_out:
         logout_item = {
             'title': '🔒 Logged Out - Action Required',
             'link': feed_info['url'],
@@ -949,8 +1345,10 @@ def get_rss_xml(feed_id):
     }
     
     rss_xml = generate_rss_xml(feed_data)
+    if not logged_out:
+        rss_xml_cache.set(feed_id, (feed_info['updated_at'], rss_xml))
     
-    return Response(rss_xml, mimetype='application/rss+xml')
+    return rss_response(rss_xml, etag)
 
 @app.route('/api/feeds/<int:feed_id>', methods=['DELETE'])
 def delete_feed(feed_id):
@@ -963,6 +1361,7 @@ def delete_feed(feed_id):
             return jsonify({"error": "Feed not found"}), 404
         
         db.delete_feed(feed_id)
+        rss_xml_cache.pop(feed_id)
         return jsonify({"message": f"Feed '{feed['title']}' deleted successfully"})
     except Exception as e:
         return jsonify({"error": f"Failed to delete feed: {str(e)}"}), 500
@@ -974,6 +1373,7 @@ def delete_all_feeds():
     """
     try:
         db.delete_all_feeds()
+        rss_xml_cache.clear()
         return jsonify({"message": "All feeds deleted successfully"})
     except Exception as e:
         return jsonify({"error": f"Failed to delete feeds: {str(e)}"}), 500
@@ -1022,6 +1422,47 @@ def delete_session(site_url):
     except Exception as e:
         return jsonify({"error": f"Failed to delete session: {str(e)}"}), 500
 
+def refresh_feed(feed_info):
+    """
+    Re-scrape a feed with its saved patterns (no AI needed) and store the
+    new items
+    Returns (response dict, HTTP status)
+    """
+    feed_id = feed_info['id']
+    
+    # Check if we have extraction patterns
+    patterns = feed_info.get('extraction_patterns')
+    if not patterns:
+        return {
+            "error": "No extraction patterns found for this feed",
+            "message": "Please re-analyze with AI to create patterns",
+            "suggestion": "Use 'Re-analyze with AI' button"
+        }, 400
+    
+    # Use smart scraper with saved patterns
+    scraper_result = scrape_with_patterns(feed_info['url'], patterns)
+    
+    if "error" in scraper_result:
+        return {"error": scraper_result["error"]}, 500
+    
+    # Update database with new content (preserve patterns)
+    db.update_feed(
+        feed_id=feed_id,
+        title=scraper_result.get('title', feed_info['title']),
+        description=scraper_result.get('description', feed_info['description']),
+        ai_provider=feed_info['ai_provider'],
+        items=scraper_result.get('items', [])
+    )
+    rss_xml_cache.pop(feed_id)
+    
+    return {
+        "message": "Feed updated successfully using smart scraping",
+        "title": scraper_result.get('title'),
+        "description": scraper_result.get('description'),
+        "items_count": len(scraper_result.get('items', [])),
+        "method": "pattern_based_scraping"
+    }, 200
+
 @app.route('/api/update/<int:feed_id>', methods=['POST'])
 def update_feed(feed_id):
     """
@@ -1033,41 +1474,52 @@ def update_feed(feed_id):
         if not feed_info:
             return jsonify({"error": "Feed not found"}), 404
         
-        # Check if we have extraction patterns
-        patterns = feed_info.get('extraction_patterns')
-        if not patterns:
-            return jsonify({
-                "error": "No extraction patterns found for this feed",
-                "message": "Please re-analyze with AI to create patterns",
-                "suggestion": "Use 'Re-analyze with AI' button"
-            }), 400
-        
-        # Use smart scraper with saved patterns
-        scraper_result = scrape_with_patterns(feed_info['url'], patterns)
-        
-        if "error" in scraper_result:
-            return jsonify({"error": scraper_result["error"]}), 500
-        
-        # Update database with new content (preserve patterns)
-        db.update_feed(
-            feed_id=feed_id,
-            title=scraper_result.get('title', feed_info['title']),
-            description=scraper_result.get('description', feed_info['description']),
-            ai_provider=feed_info['ai_provider'],
-            items=scraper_result.get('items', [])
-        )
-        
-        return jsonify({
-            "message": "Feed updated successfully using smart scraping",
-            "title": scraper_result.get('title'),
-            "description": scraper_result.get('description'),
-            "items_count": len(scraper_result.get('items', [])),
-            "method": "pattern_based_scraping"
-        })
+        result, status = refresh_feed(feed_info)
+        return jsonify(result), status
         
     except Exception as e:
         return jsonify({"error": f"Update failed: {str(e)}"}), 500
 
+# Feeds refreshed at once by /api/feeds/refresh; each one is mostly
+# waiting on its site
+REFRESH_WORKERS = int(os.environ.get('REFRESH_WORKERS', 8))
+REFRESH_TIMEOUT_SECONDS = 120
+
+@app.route('/api/feeds/refresh', methods=['POST'])
+def refresh_all_feeds():
+    """
+    Update every feed with its saved patterns, fetching them concurrently
+    """
+    feeds = db.get_all_feeds()
+    results = []
+    executor = ThreadPoolExecutor(max_workers=REFRESH_WORKERS, thread_name_prefix='refresh')
+    try:
+        futures = {executor.submit(refresh_feed, feed): feed for feed in feeds}
+        try:
+            for future in as_completed(futures, timeout=REFRESH_TIMEOUT_SECONDS):
+                feed = futures[future]
+                try:
+                    result, status = future.result()
+                except Exception as e:
+                    result, status = {"error": f"Update failed: {str(e)}"}, 500
+                results.append(dict(result, feed_id=feed['id'], status=status))
+        except FuturesTimeoutError:
+            logger.warning("Feed refresh timed out after %ss", REFRESH_TIMEOUT_SECONDS)
+            for future, feed in futures.items():
+                if not future.done():
+                    results.append({"feed_id": feed['id'], "status": 504, "error": "Update timed out"})
+    finally:
+        # Feeds still running finish in the background
+        executor.shutdown(wait=False, cancel_futures=True)
+    
+    updated = sum(1 for result in results if result['status'] == 200)
+    return jsonify({
+        "updated": updated,
+        "failed": len(results) - updated,
+        "total": len(feeds),
+        "results": results
+    })
+
 @app.route('/api/reanalyze/<int:feed_id>', methods=['POST'])
 def reanalyze_feed(feed_id):
     """
@@ -1089,7 +1541,7 @@ def reanalyze_feed(feed_id):
         
         # Use saved API key if not provided
         if not api_key:
-            api_key = config_manager.get_api_key(ai_provider)
+            api_key = saved_api_key(ai_provider)
             if not api_key:
                 return jsonify({
                     "error": f"No API key found for {ai_provider}",
@@ -1100,20 +1552,17 @@ def reanalyze_feed(feed_id):
         headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
         }
-        response = requests.get(feed_info['url'], headers=headers, timeout=10)
+        response = http_session.get(feed_info['url'], headers=headers, timeout=10, stream=True)
         response.raise_for_status()
+        read_capped(response)
         
         # Extract structured content like in generate_rss
-        soup = BeautifulSoup(response.content, 'html.parser')
-        
-        # Remove script and style elements
-        for script in soup(["script", "style", "nav", "footer", "aside", "form", "button"]):
-            script.decompose()
-        
-        # Use helper function to extract structured content
-        html_content = extract_structured_content_from_html(soup, feed_info['url'])
-        print(f"HTML content length: {len(html_content)} characters")
-        print(f"HTML content preview: {html_content[:300]}...")
+        html_content = CPU_POOL.submit(extract_page_content, response.content, feed_info['url']).result()
+        if isinstance(html_content, list):
+            logger.debug("Structured articles: %s", len(html_content))
+        else:
+            logger.debug("HTML content length: %s characters", len(html_content))
+            logger.debug("HTML content preview: %s...", html_content[:300])
         
         # Get AI provider and extract content with fallback
         if api_key:
@@ -1122,35 +1571,18 @@ def reanalyze_feed(feed_id):
         else:
             ai_result, _ = try_ai_with_fallback(ai_provider, feed_info['url'], html_content)
         
-        # Safety check: ensure ai_result is a dict
-        if isinstance(ai_result, tuple):
-            print(f"WARNING: reanalyze got tuple, extracting first element: {ai_result}")
-            ai_result = ai_result[0] if ai_result else {"error": "Invalid result format"}
-        
-        if not isinstance(ai_result, dict):
-            print(f"ERROR: reanalyze ai_result is not a dict: {type(ai_result)} = {ai_result}")
-            return jsonify({"error": f"Invalid AI response format: {type(ai_result).__name__}"}), 500
-        
-        print(f"✓ reanalyze ai_result is valid dict with keys: {list(ai_result.keys())}")
-        
-        if "error" in ai_result:
-            return jsonify({"error": ai_result["error"]}), 500
+        ai_result, error = _normalize_ai_result(ai_result)
+        if error:
+            body, status = error
+            return jsonify(body), status
         
         # Extract new patterns (simple fallback)
-        extraction_patterns = json.dumps({
-            'base_url': '/'.join(feed_info['url'].split('/')[:3]),
-            'article_patterns': ['article', 'div.post', 'div.entry'],
-            'image_patterns': [{'selector': 'img', 'category': 'general'}]
-        })
+        extraction_patterns = default_extraction_patterns(_base_url(feed_info['url']))
         
         # Update database with new patterns and content
-        try:
-            title = ai_result.get('title', feed_info['title'])
-            description = ai_result.get('description', feed_info['description'])
-            items = ai_result.get('items', [])
-        except AttributeError as e:
-            print(f"❌ ERROR in reanalyze: ai_result has no .get()! Type: {type(ai_result)}, Value: {ai_result}")
-            return jsonify({"error": f"Internal error: ai_result is {type(ai_result).__name__}, not dict"}), 500
+        title = ai_result.get('title', feed_info['title'])
+        description = ai_result.get('description', feed_info['description'])
+        items = ai_result.get('items', [])
         
         # Update existing feed (preserve feed_id and rss_url)
         db.update_feed(
@@ -1161,6 +1593,7 @@ def reanalyze_feed(feed_id):
             items=items,
             extraction_patterns=extraction_patterns
         )
+        rss_xml_cache.pop(feed_id)
         
         return jsonify({
             "message": "Feed re-analyzed successfully with AI",
@@ -1228,7 +1661,6 @@ def get_saved_api_keys():
     """
     Get list of saved API key providers with counts
     """
-    print("=== GET SAVED API KEYS ===")
     try:
         providers = config_manager.get_saved_providers()
         
@@ -1238,13 +1670,13 @@ def get_saved_api_keys():
             keys = config_manager.get_all_api_keys(provider)
             providers_info[provider] = len(keys)
         
-        print(f"Found saved providers: {providers_info}")
+        logger.debug("Found saved providers: %s", providers_info)
         return jsonify({
             "saved_providers": providers,
             "providers_info": providers_info
         })
     except Exception as e:
-        print(f"Error getting saved providers: {e}")
+        logger.error("Error getting saved providers: %s", e)
         return jsonify({"saved_providers": [], "error": str(e)})
 
 @app.route('/api/config/api-keys/<provider>/all', methods=['GET'])
@@ -1252,7 +1684,7 @@ def get_all_keys_for_provider(provider):
     """
     Get all API keys for a specific provider (masked)
     """
-    if provider not in ['openai', 'gemini', 'claude', 'perplexity']:
+    if provider not in VALID_PROVIDERS:
         return jsonify({"error": "Invalid provider"}), 400
     
     try:
@@ -1275,19 +1707,17 @@ def save_api_key():
     """
     Save API key for a provider (supports multiple keys)
     """
-    print("=== SAVE API KEY REQUEST ===")
     data = request.get_json()
-    print(f"Received data: {data}")
     
     if not data or 'provider' not in data or 'api_key' not in data:
-        print("Missing required fields")
+        logger.debug("Save API key: missing required fields")
         return jsonify({"error": "Provider and api_key required"}), 400
     
     provider = data['provider']
     api_key = data['api_key'].strip()
     
-    if provider not in ['openai', 'gemini', 'claude', 'perplexity']:
-        print(f"Invalid provider: {provider}")
+    if provider not in VALID_PROVIDERS:
+        logger.debug("Save API key: invalid provider %s", provider)
         return jsonify({"error": "Invalid provider"}), 400
     
     if not api_key:
@@ -1295,24 +1725,23 @@ def save_api_key():
     
     try:
         # Check if this API key already exists in ANY provider
-        all_providers = ['openai', 'gemini', 'claude', 'perplexity']
-        for check_provider in all_providers:
+        for check_provider in PROVIDERS:
             existing_keys = config_manager.get_all_api_keys(check_provider)
             if api_key in existing_keys:
-                print(f"❌ API key already exists in {check_provider}")
+                logger.debug("API key already exists in %s", check_provider)
                 return jsonify({
                     "error": f"This API key is already registered for {check_provider.upper()}"
                 }), 400
         
         config_manager.save_api_key(provider, api_key)
         keys_count = len(config_manager.get_all_api_keys(provider))
-        print(f"Successfully saved API key for {provider} (total: {keys_count})")
+        logger.info("Saved API key for %s (total: %s)", provider, keys_count)
         return jsonify({
             "message": f"API key saved for {provider}",
             "total_keys": keys_count
         })
     except Exception as e:
-        print(f"Error saving API key: {e}")
+        logger.error("Error saving API key: %s", e)
         return jsonify({"error": f"Failed to save API key: {str(e)}"}), 500
 
 @app.route('/api/config/api-keys/<provider>', methods=['DELETE'])
@@ -1320,13 +1749,13 @@ def delete_api_key_route(provider):
     """
     Delete specific API key or all keys for a provider
     """
-    if provider not in ['openai', 'gemini', 'claude', 'perplexity']:
+    if provider not in VALID_PROVIDERS:
         return jsonify({"error": "Invalid provider"}), 400
     
     try:
         data = request.get_json(force=True, silent=True) or {}
     except Exception as e:
-        print(f"Error parsing JSON in DELETE request: {e}")
+        logger.debug("Error parsing JSON in DELETE request: %s", e)
         data = {}
     
     api_key = data.get('api_key')  # If provided, delete specific key
@@ -1378,7 +1807,7 @@ def save_last_ai_provider():
         return jsonify({"error": "Provider required"}), 400
     
     provider = data['provider']
-    if provider not in ['openai', 'gemini', 'claude', 'perplexity']:
+    if provider not in FEED_PROVIDERS:
         return jsonify({"error": "Invalid provider"}), 400
     
     config_manager.save_last_ai_provider(provider)
@@ -1398,7 +1827,7 @@ def test_gemini_models():
         # URL para listar modelos disponíveis
         list_url = f"https://generativelanguage.googleapis.com/v1beta/models?key={api_key}"
         
-        response = requests.get(list_url)
+        response = http_session.get(list_url, timeout=15)
         
         if response.status_code == 200:
             data = response.json()
@@ -1442,7 +1871,7 @@ def rss_bridge():
             "redirect_to": "/api/info",
             "new_format": {
                 "url": "Website URL",
-                "ai_provider": "openai|gemini|claude|perplexity",
+                "ai_provider": "openai|gemini|claude|perplexity|hedged",
                 "api_key": "Your AI provider API key"
             }
         }), 400
@@ -1454,4 +1883,5 @@ def rss_bridge():
     }), 400
 
 if __name__ == '__main__':
-    app.run(host='0.0.0.0', port=8895, debug=True)
+    # Dev server only; the container runs gunicorn (see Dockerfile)
+    app.run(host='0.0.0.0', port=8895, debug=os.getenv('FLASK_ENV') == 'development')
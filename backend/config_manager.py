@@ -1,7 +1,12 @@
+import copy
 import json
+import logging
 import os
 from cryptography.fernet import Fernet
 import base64
+from ttl_cache import TTLCache
+
+logger = logging.getLogger(__name__)
 
 class ConfigManager:
     def __init__(self, config_path="/app/data/config.json", key_path="/app/data/encryption.key"):
@@ -13,24 +18,28 @@ class ConfigManager:
         os.makedirs(os.path.dirname(self.key_path), exist_ok=True)
         
         self.cipher = self._get_or_create_cipher()
-        print(f"ConfigManager initialized - config: {self.config_path}, key: {self.key_path}")
+        # Parsed config file and decrypted keys per provider; every config
+        # write clears both
+        self._config_cache = TTLCache(maxsize=1, ttl=30)
+        self._api_keys_cache = TTLCache(maxsize=64, ttl=30)
+        logger.debug("ConfigManager initialized - config: %s, key: %s", self.config_path, self.key_path)
         
     def _get_or_create_cipher(self):
         """Get or create encryption key for API keys"""
         if os.path.exists(self.key_path):
             with open(self.key_path, 'rb') as f:
                 key = f.read()
-            print("Loaded existing encryption key")
+            logger.debug("Loaded existing encryption key")
         else:
             key = Fernet.generate_key()
             with open(self.key_path, 'wb') as f:
                 f.write(key)
-            print("Created new encryption key")
+            logger.info("Created new encryption key")
         return Fernet(key)
     
     def save_api_key(self, provider, api_key):
         """Save encrypted API key for a provider (supports multiple keys)"""
-        print(f"Saving API key for provider: {provider}")
+        logger.debug("Saving API key for provider: %s", provider)
         config = self.load_config()
         if 'api_keys' not in config:
             config['api_keys'] = {}
@@ -48,9 +57,8 @@ class ConfigManager:
         
         # Check if key already exists (prevent duplicates)
         try:
-            existing_keys = [self.cipher.decrypt(k.encode()).decode() for k in config['api_keys'][provider]]
-            if api_key in existing_keys:
-                print(f"API key already exists for {provider}, skipping duplicate")
+            if api_key in self.get_all_api_keys(provider):
+                logger.debug("API key already exists for %s, skipping duplicate", provider)
                 return
         except:
             pass
@@ -59,13 +67,13 @@ class ConfigManager:
         config['api_keys'][provider].append(encrypted_key)
         
         self._save_config(config)
-        print(f"API key saved successfully for {provider} (total keys: {len(config['api_keys'][provider])})")
+        logger.debug("API key saved successfully for %s (total keys: %s)", provider, len(config['api_keys'][provider]))
     
     def get_api_key(self, provider, index=0):
         """Get decrypted API key for a provider (returns first key by default)"""
         config = self.load_config()
         if 'api_keys' not in config or provider not in config['api_keys']:
-            print(f"No API key found for provider: {provider}")
+            logger.debug("No API key found for provider: %s", provider)
             return None
         
         keys = config['api_keys'][provider]
@@ -75,18 +83,21 @@ class ConfigManager:
             keys = [keys]
         
         if index >= len(keys):
-            print(f"Key index {index} out of range for provider {provider}")
+            logger.debug("Key index %s out of range for provider %s", index, provider)
             return None
         
         try:
             encrypted_key = keys[index].encode()
             return self.cipher.decrypt(encrypted_key).decode()
         except Exception as e:
-            print(f"Error decrypting API key for {provider}: {e}")
+            logger.error("Error decrypting API key for %s: %s", provider, e)
             return None
     
     def get_all_api_keys(self, provider):
-        """Get all decrypted API keys for a provider"""
+        """Get all decrypted API keys for a provider (cached for a few seconds)"""
+        return list(self._api_keys_cache.get_or_load(provider, lambda: self._load_all_api_keys(provider)))
+    
+    def _load_all_api_keys(self, provider):
         config = self.load_config()
         if 'api_keys' not in config or provider not in config['api_keys']:
             return []
@@ -100,18 +111,18 @@ class ConfigManager:
         try:
             return [self.cipher.decrypt(k.encode()).decode() for k in keys]
         except Exception as e:
-            print(f"Error decrypting API keys for {provider}: {e}")
+            logger.error("Error decrypting API keys for %s: %s", provider, e)
             return []
     
     def delete_api_key(self, provider, api_key=None):
         """Delete specific API key or all keys for a provider"""
-        print(f"Deleting API key for provider: {provider}")
+        logger.debug("Deleting API key for provider: %s", provider)
         config = self.load_config()
         if 'api_keys' in config and provider in config['api_keys']:
             if api_key is None:
                 # Delete all keys for provider
                 del config['api_keys'][provider]
-                print(f"All API keys deleted for {provider}")
+                logger.info("All API keys deleted for %s", provider)
             else:
                 # Delete specific key
                 keys = config['api_keys'][provider]
@@ -130,9 +141,9 @@ class ConfigManager:
                         if len(keys) == 0:
                             del config['api_keys'][provider]
                         
-                        print(f"Specific API key deleted for {provider}")
+                        logger.info("Specific API key deleted for %s", provider)
                 except Exception as e:
-                    print(f"Error deleting specific key: {e}")
+                    logger.error("Error deleting specific key: %s", e)
             
             self._save_config(config)
     
@@ -140,7 +151,7 @@ class ConfigManager:
         """Get list of providers with saved API keys"""
         config = self.load_config()
         providers = list(config.get('api_keys', {}).keys())
-        print(f"Saved providers: {providers}")
+        logger.debug("Saved providers: %s", providers)
         return providers
     
     def save_theme(self, theme):
@@ -166,28 +177,34 @@ class ConfigManager:
         return config.get('last_ai_provider', 'openai')
     
     def load_config(self):
-        """Load configuration from file"""
-        print(f"Loading config from: {self.config_path}")
+        """Load configuration from file (cached for a few seconds, callers get their own copy)"""
+        return copy.deepcopy(self._config_cache.get_or_load('config', self._read_config))
+    
+    def _read_config(self):
+        logger.debug("Loading config from: %s", self.config_path)
         if os.path.exists(self.config_path):
             try:
                 with open(self.config_path, 'r') as f:
                     config = json.load(f)
-                print(f"Loaded config: {config}")
+                logger.debug("Config loaded")
                 return config
             except Exception as e:
-                print(f"Error loading config: {e}")
+                logger.error("Error loading config: %s", e)
                 return {}
-        print("Config file doesn't exist, returning empty config")
+        logger.debug("Config file doesn't exist, returning empty config")
         return {}
     
     def _save_config(self, config):
         """Save configuration to file"""
-        print(f"Saving config to: {self.config_path}")
-        print(f"Config data: {config}")
+        logger.debug("Saving config to: %s", self.config_path)
         try:
             with open(self.config_path, 'w') as f:
                 json.dump(config, f, indent=2)
-            print("Config saved successfully")
+            logger.debug("Config saved successfully")
         except Exception as e:
-            print(f"Error saving config: {e}")
-            raise
\ No newline at end of file
+            logger.error("Error saving config: %s", e)
+            raise
+        finally:
+            # After the write: a read racing it would re-cache the old file
+            self._config_cache.clear()
+            self._api_keys_cache.clear()
\ No newline at end of file
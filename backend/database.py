@@ -1,16 +1,67 @@
 import sqlite3
 import os
+import logging
+import copy
+import queue
+import atexit
+import threading
+from collections import defaultdict
 from datetime import datetime
+from ttl_cache import TTLCache
+
+logger = logging.getLogger(__name__)
 
 class DatabaseManager:
+    # Ids per "IN (...)" query
+    IN_BATCH_SIZE = 500
+    
     def __init__(self, db_path="feeds.db"):
         self.db_path = db_path
+        # Site sessions are read on every fetch; writes below invalidate
+        self._session_cache = TTLCache(maxsize=256, ttl=30)
+        # Write-behind queue for writes nobody waits on (page cache, session
+        # state), applied in order by a single writer thread
+        self._write_queue = queue.Queue()
+        self._writer_thread = None
+        self._writer_lock = threading.Lock()
         self.init_database()
     
+    def _enqueue_write(self, sql, params, after=None):
+        """Queue a write for the writer thread; after() runs once it is committed"""
+        with self._writer_lock:
+            if self._writer_thread is None:
+                self._writer_thread = threading.Thread(target=self._run_writer, daemon=True)
+                self._writer_thread.start()
+                # Don't lose queued writes on a clean shutdown
+                atexit.register(self.flush)
+        self._write_queue.put((sql, params, after))
+    
+    def _run_writer(self):
+        conn = sqlite3.connect(self.db_path)
+        conn.execute('PRAGMA synchronous=NORMAL')
+        while True:
+            sql, params, after = self._write_queue.get()
+            try:
+                conn.execute(sql, params)
+                conn.commit()
+                if after:
+                    after()
+            except Exception as e:
+                logger.exception("Background database write failed: %s", e)
+            finally:
+                self._write_queue.task_done()
+    
+    def flush(self):
+        """Block until every queued write is committed"""
+        self._write_queue.join()
+    
     def init_database(self):
         conn = sqlite3.connect(self.db_path)
         cursor = conn.cursor()
         
+        # WAL lets request threads keep reading while the writer commits
+        cursor.execute('PRAGMA journal_mode=WAL')
+        
         # Create feeds table
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS feeds (
@@ -41,6 +92,8 @@ class DatabaseManager:
                 FOREIGN KEY (feed_id) REFERENCES feeds (id)
             )
         ''')
+        # Items are always read and replaced per feed
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_feed_items_feed_id ON feed_items (feed_id)')
         
         # Create site_sessions table for login credentials
         cursor.execute('''
@@ -65,10 +118,18 @@ class DatabaseManager:
                 content TEXT,
                 status_code INTEGER,
                 cached_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                expires_at TIMESTAMP NOT NULL
+                expires_at TIMESTAMP NOT NULL,
+                etag TEXT,
+                last_modified TEXT
             )
         ''')
         
+        # Older databases: add the conditional GET validator columns
+        cache_columns = {row[1] for row in cursor.execute('PRAGMA table_info(content_cache)')}
+        for column in ('etag', 'last_modified'):
+            if column not in cache_columns:
+                cursor.execute(f'ALTER TABLE content_cache ADD COLUMN {column} TEXT')
+        
         conn.commit()
         conn.close()
     
@@ -186,6 +247,42 @@ class DatabaseManager:
         conn.close()
         return items
     
+    def get_items_for_feeds(self, feed_ids):
+        """Get items for several feeds in one query, grouped by feed id"""
+        items_by_feed = defaultdict(list)
+        if not feed_ids:
+            return items_by_feed
+        
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        
+        # Batches stay under SQLite's bound-parameter limit (999 on older builds)
+        feed_ids = list(feed_ids)
+        for start in range(0, len(feed_ids), self.IN_BATCH_SIZE):
+            batch = feed_ids[start:start + self.IN_BATCH_SIZE]
+            placeholders = ','.join('?' * len(batch))
+            cursor.execute(f'''
+                SELECT feed_id, title, link, description, pub_date, image
+                FROM feed_items WHERE feed_id IN ({placeholders})
+                ORDER BY feed_id,
+                    CASE 
+                        WHEN pub_date IS NOT NULL AND pub_date != '' THEN pub_date
+                        ELSE created_at
+                    END DESC
+            ''', batch)
+            
+            for row in cursor.fetchall():
+                items_by_feed[row[0]].append({
+                    'title': row[1],
+                    'link': row[2],
+                    'description': row[3],
+                    'pubDate': row[4],
+                    'image': row[5]
+                })
+        
+        conn.close()
+        return items_by_feed
+    
     def get_feed_by_url(self, url):
         conn = sqlite3.connect(self.db_path)
         cursor = conn.cursor()
@@ -330,9 +427,14 @@ class DatabaseManager:
         
         conn.commit()
         conn.close()
+        self._session_cache.pop(site_url)
     
     def get_site_session(self, site_url):
-        """Get login session for a website"""
+        """Get login session for a website (cached for a few seconds)"""
+        session = self._session_cache.get_or_load(site_url, lambda: self._load_site_session(site_url))
+        return copy.deepcopy(session)
+    
+    def _load_site_session(self, site_url):
         import json
         
         conn = sqlite3.connect(self.db_path)
@@ -393,19 +495,15 @@ class DatabaseManager:
         
         conn.commit()
         conn.close()
+        self._session_cache.pop(site_url)
     
     def mark_session_logged_out(self, site_url):
-        """Mark a session as logged out"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
+        """Mark a session as logged out (written in the background)"""
+        self._session_cache.pop(site_url)
+        self._enqueue_write('''
             UPDATE site_sessions SET logged_in = 0, last_validated = CURRENT_TIMESTAMP
             WHERE site_url = ?
-        ''', (site_url,))
-        
-        conn.commit()
-        conn.close()
+        ''', (site_url,), after=lambda: self._session_cache.pop(site_url))
     
     # Content Cache Management
     def get_cached_content(self, url):
@@ -433,22 +531,52 @@ class DatabaseManager:
             }
         return None
     
-    def save_cached_content(self, url, content, status_code, cache_hours=24):
-        """Save content to cache with expiration"""
-        from datetime import datetime, timedelta
-        
+    def get_cache_validators(self, url):
+        """
+        Get ETag/Last-Modified and content of the cache entry for url, even
+        if expired, for a conditional GET; None if there are no validators
+        """
         conn = sqlite3.connect(self.db_path)
         cursor = conn.cursor()
         
-        expires_at = datetime.now() + timedelta(hours=cache_hours)
-        
         cursor.execute('''
-            INSERT OR REPLACE INTO content_cache (url, content, status_code, cached_at, expires_at)
-            VALUES (?, ?, ?, CURRENT_TIMESTAMP, ?)
-        ''', (url, content, status_code, expires_at.strftime('%Y-%m-%d %H:%M:%S')))
+            SELECT content, etag, last_modified
+            FROM content_cache
+            WHERE url = ? AND (etag IS NOT NULL OR last_modified IS NOT NULL)
+        ''', (url,))
         
-        conn.commit()
+        row = cursor.fetchone()
         conn.close()
+        
+        if row:
+            return {
+                'content': row[0],
+                'etag': row[1],
+                'last_modified': row[2]
+            }
+        return None
+    
+    def save_cached_content(self, url, content, status_code, cache_hours=24, etag=None, last_modified=None):
+        """Save content to cache with expiration (and the response validators, if any), in the background"""
+        from datetime import datetime, timedelta
+        
+        expires_at = datetime.now() + timedelta(hours=cache_hours)
+        
+        self._enqueue_write('''
+            INSERT OR REPLACE INTO content_cache (url, content, status_code, cached_at, expires_at, etag, last_modified)
+            VALUES (?, ?, ?, CURRENT_TIMESTAMP, ?, ?, ?)
+        ''', (url, content, status_code, expires_at.strftime('%Y-%m-%d %H:%M:%S'), etag, last_modified))
+    
+    def refresh_cached_content(self, url, cache_hours=24):
+        """Extend a cache entry after the site answered 304 Not Modified, in the background"""
+        from datetime import datetime, timedelta
+        
+        expires_at = datetime.now() + timedelta(hours=cache_hours)
+        
+        self._enqueue_write('''
+            UPDATE content_cache SET cached_at = CURRENT_TIMESTAMP, expires_at = ?
+            WHERE url = ?
+        ''', (expires_at.strftime('%Y-%m-%d %H:%M:%S'), url))
     
     def clear_expired_cache(self):
         """Remove expired cache entries"""
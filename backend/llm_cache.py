@@ -0,0 +1,140 @@
+"""
+LLM Cache - TTL cache for parsed AI provider responses, in memory with
+optional sqlite persistence across restarts
+"""
+import copy
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+# Tracking query parameters that change between page loads without
+# changing what the page is about (utm_*, click ids, referral tags...)
+_TRACKING_PARAM_RE = re.compile(
+    r'([?&])(?:utm_[a-z]+|fbclid|gclid|dclid|msclkid|mc_cid|mc_eid|_ga|ref|ref_src|igshid)=[^&\s"\'<>]*&?',
+    re.IGNORECASE
+)
+_DANGLING_QUERY_RE = re.compile(r'[?&](?=[\s"\'<>]|$)')
+_WHITESPACE_RE = re.compile(r'\s+')
+
+def normalize_content(content):
+    """
+    Normalize page content so near-duplicate pages (whitespace changes,
+    rotating tracker ids) map to the same cache key
+    """
+    content = _TRACKING_PARAM_RE.sub(r'\1', content)
+    content = _DANGLING_QUERY_RE.sub('', content)
+    return _WHITESPACE_RE.sub(' ', content).strip()
+
+class LLMCache:
+    def __init__(self, maxsize=1024, ttl=3600, path=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.path = path
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0}
+        if self.path:
+            self._init_db()
+
+    def _init_db(self):
+        conn = sqlite3.connect(self.path)
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS llm_cache (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                expires_at REAL NOT NULL
+            )
+        ''')
+        conn.execute('DELETE FROM llm_cache WHERE expires_at <= ?', (time.time(),))
+        conn.commit()
+        conn.close()
+
+    def _load(self, key):
+        """Read a non-expired entry from disk; returns (value, seconds_left) or None"""
+        conn = sqlite3.connect(self.path)
+        row = conn.execute(
+            'SELECT value, expires_at FROM llm_cache WHERE key = ? AND expires_at > ?',
+            (key, time.time())
+        ).fetchone()
+        conn.close()
+        if row is None:
+            return None
+        return json.loads(row[0]), row[1] - time.time()
+
+    def _store(self, key, value):
+        conn = sqlite3.connect(self.path)
+        conn.execute(
+            'INSERT OR REPLACE INTO llm_cache (key, value, expires_at) VALUES (?, ?, ?)',
+            (key, json.dumps(value), time.time() + self.ttl)
+        )
+        conn.commit()
+        conn.close()
+
+    def _remember(self, key, value, ttl):
+        """Put an entry in the in-memory LRU; caller holds the lock"""
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    @staticmethod
+    def make_key(provider, model, url, content):
+        """Build a deterministic key from everything that shapes the prompt"""
+        payload = json.dumps({"p": provider, "m": model, "u": url, "c": normalize_content(content)}, sort_keys=True)
+        return hashlib.blake2b(payload.encode(), digest_size=16).hexdigest()
+
+    def get(self, key):
+        """Return a copy of the cached result, or None if missing/expired"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] >= time.monotonic():
+                self._entries.move_to_end(key)
+                self.stats["hits"] += 1
+                value = entry[1]
+            else:
+                if entry is not None:
+                    del self._entries[key]
+                value = None
+
+        if value is None:
+            # Fall back to disk, e.g. after a restart, and keep the entry
+            # in memory for the rest of its lifetime
+            stored = self._load(key) if self.path else None
+            with self._lock:
+                if stored is None:
+                    self.stats["misses"] += 1
+                    return None
+                value, ttl = stored
+                self._remember(key, value, ttl)
+                self.stats["hits"] += 1
+
+        # Callers may mutate the result, never hand out the cached object
+        return copy.deepcopy(value)
+
+    def set(self, key, value):
+        """Cache a successful result (error results are never cached)"""
+        if not isinstance(value, dict) or "error" in value:
+            return
+
+        with self._lock:
+            self._remember(key, copy.deepcopy(value), self.ttl)
+        if self.path:
+            self._store(key, value)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+        if self.path:
+            conn = sqlite3.connect(self.path)
+            conn.execute('DELETE FROM llm_cache')
+            conn.commit()
+            conn.close()
+
+# Global cache instance shared by all providers; set LLM_CACHE_PATH to a
+# sqlite file to keep results across restarts
+llm_cache = LLMCache(path=os.environ.get("LLM_CACHE_PATH"))
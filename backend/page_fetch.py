@@ -0,0 +1,62 @@
+"""
+Page Fetch - pooled HTTP sessions and size-capped reads of streamed page
+responses, shared by the generate endpoints, the smart scraper and the
+scheduler
+"""
+import http.cookiejar
+import logging
+import os
+import requests
+from requests.adapters import HTTPAdapter
+from requests.packages.urllib3.util.retry import Retry
+
+logger = logging.getLogger(__name__)
+
+# Retry policy shared by every adapter (Retry objects are immutable, urllib3
+# copies them per request with .increment())
+FETCH_RETRY = Retry(
+    total=3,
+    read=3,
+    connect=3,
+    backoff_factor=0.3,
+    status_forcelist=(500, 502, 504)
+)
+
+def create_session(pool_connections=32, pool_maxsize=64):
+    """
+    Session with pooled keep-alive connections and FETCH_RETRY, so repeat
+    fetches from a site skip the TCP + TLS handshake
+    Its jar rejects every cookie: a long-lived session would otherwise
+    replay whatever a site set once (consent, bot-check and rate-limit
+    tokens, or a rotated login cookie) on every later fetch. Cookies
+    passed per request still apply, redirects included
+    """
+    session = requests.Session()
+    session.cookies.set_policy(http.cookiejar.DefaultCookiePolicy(allowed_domains=[]))
+    adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize, max_retries=FETCH_RETRY)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+# Pages are streamed and cut at this size so a huge page can't blow up
+# memory (and the parse) for one request
+MAX_HTML_BYTES = int(os.environ.get('MAX_HTML_BYTES', 4 * 1024 * 1024))
+
+def read_capped(response, limit=MAX_HTML_BYTES):
+    """
+    Read at most limit bytes of a streamed response body and release the
+    connection; response.content/.text then return the capped body
+    """
+    chunks = []
+    size = 0
+    try:
+        for chunk in response.iter_content(chunk_size=64 * 1024):
+            chunks.append(chunk)
+            size += len(chunk)
+            if size >= limit:
+                logger.warning("Page is larger than %s bytes, truncating", limit)
+                break
+    finally:
+        response.close()
+    response._content = b''.join(chunks)[:limit]
+    return response._content
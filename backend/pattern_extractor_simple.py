@@ -2,8 +2,11 @@
 Simple Pattern Extractor - Backup version
 """
 import json
+import logging
 from bs4 import BeautifulSoup
 
+logger = logging.getLogger(__name__)
+
 def extract_patterns(url, html_content, ai_result):
     """Simple pattern extraction"""
     try:
@@ -24,5 +27,5 @@ def extract_patterns(url, html_content, ai_result):
         
         return json.dumps(patterns, indent=2)
     except Exception as e:
-        print(f"Pattern extraction error: {e}")
+        logger.warning("Pattern extraction error: %s", e)
         return "{}"
\ No newline at end of file
@@ -1,5 +1,4 @@
-from xml.etree.ElementTree import Element, SubElement, tostring
-from xml.dom import minidom
+from lxml.etree import Element, SubElement, tostring
 from datetime import datetime
 
 def generate_rss_xml(feed_data):
@@ -40,22 +39,22 @@ def generate_rss_xml(feed_data):
         item_description = SubElement(item, 'description')
         
         # Create enhanced description with source link and image
-        enhanced_description = ""
+        parts = []
         
         # Add image if available
         if item_data.get('image'):
-            enhanced_description += f'<img src="{item_data["image"]}" style="max-width:100%; height:auto; margin-bottom:10px;" alt="Article image"><br>'
+            parts.append(f'<img src="{item_data["image"]}" style="max-width:100%; height:auto; margin-bottom:10px;" alt="Article image"><br>')
         
         # Add source link
         if item_data.get('link'):
-            enhanced_description += f'<p><strong><a href="{item_data["link"]}" target="_blank" style="color:#007cba; text-decoration:none;">🔗 Read Full Article</a></strong></p>'
+            parts.append(f'<p><strong><a href="{item_data["link"]}" target="_blank" style="color:#007cba; text-decoration:none;">🔗 Read Full Article</a></strong></p>')
         
         # Add description
         original_description = item_data.get('description', '')
         if original_description:
-            enhanced_description += f'<p>{original_description}</p>'
+            parts.append(f'<p>{original_description}</p>')
         
-        item_description.text = enhanced_description or 'No description available'
+        item_description.text = ''.join(parts) or 'No description available'
         
         if item_data.get('pubDate'):
             pub_date = SubElement(item, 'pubDate')
@@ -64,10 +63,8 @@ def generate_rss_xml(feed_data):
         guid = SubElement(item, 'guid')
         guid.text = item_data.get('link', f"item_{datetime.now().timestamp()}")
     
-    # Convert to pretty XML string
-    rough_string = tostring(rss, 'utf-8')
-    reparsed = minidom.parseString(rough_string)
-    return reparsed.toprettyxml(indent="  ")
+    # Serialize (and indent) in one lxml pass, no minidom re-parse
+    return tostring(rss, xml_declaration=True, encoding='UTF-8', pretty_print=True)
 
 def get_rss_link(feed_id):
     """
@@ -1,14 +1,19 @@
 import time
+import logging
 import threading
-from datetime import datetime, timedelta
 import schedule
 import os
 import json
 from database import DatabaseManager
 from ai_providers import get_ai_provider
-import requests
+from page_fetch import create_session, read_capped
 from bs4 import BeautifulSoup
 
+# Automatic updates share one pooled session
+_SESSION = create_session()
+
+logger = logging.getLogger(__name__)
+
 class FeedScheduler:
     def __init__(self, db_manager):
         self.db = db_manager
@@ -20,19 +25,25 @@ class FeedScheduler:
         """Set API key for a provider for auto-updates"""
         self.api_keys[provider] = api_key
         
+    def _api_key_for(self, provider):
+        """API key for a feed's provider; "hedged" feeds get every configured (provider, key) pair"""
+        if provider == 'hedged':
+            return [(name, key) for name, key in self.api_keys.items() if name != 'hedged'] or None
+        return self.api_keys.get(provider)
+        
     def start_scheduler(self):
         """Start the background scheduler"""
         if not self.running:
             self.running = True
             self.scheduler_thread = threading.Thread(target=self._run_scheduler, daemon=True)
             self.scheduler_thread.start()
-            print("Feed scheduler started")
+            logger.info("Feed scheduler started")
             
     def stop_scheduler(self):
         """Stop the background scheduler"""
         self.running = False
         # Don't wait for thread to finish - it will stop on next iteration
-        print("Feed scheduler stopped")
+        logger.info("Feed scheduler stopped")
         
     def _run_scheduler(self):
         """Run the scheduler loop"""
@@ -49,40 +60,59 @@ class FeedScheduler:
             
     def _update_all_feeds(self):
         """Update all feeds that have API keys available"""
-        print(f"[{datetime.now()}] Running automatic feed updates...")
+        logger.info("Running automatic feed updates...")
         
         feeds = self.db.get_all_feeds()
         updated_count = 0
         
         for feed in feeds:
-            provider = feed['ai_provider']
-            if provider in self.api_keys:
+            api_key = self._api_key_for(feed['ai_provider'])
+            if api_key:
                 try:
-                    success = self._update_single_feed(feed, self.api_keys[provider])
+                    success = self._update_single_feed(feed, api_key)
                     if success:
                         updated_count += 1
-                        print(f"Updated feed: {feed['title']}")
+                        logger.info("Updated feed: %s", feed['title'])
                     else:
-                        print(f"Failed to update feed: {feed['title']}")
+                        logger.warning("Failed to update feed: %s", feed['title'])
                 except Exception as e:
-                    print(f"Error updating feed {feed['title']}: {str(e)}")
+                    logger.error("Error updating feed %s: %s", feed['title'], e)
                     
                 # Add delay between requests to be respectful
                 time.sleep(2)
         
-        print(f"Automatic update completed. Updated {updated_count} feeds.")
+        logger.info("Automatic update completed. Updated %s feeds.", updated_count)
         
     def _update_single_feed(self, feed, api_key):
         """Update a single feed with fresh content"""
         try:
             # Fetch fresh content
+            url = feed['url']
             headers = {
                 'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
             }
-            response = requests.get(feed['url'], headers=headers, timeout=10)
+            # Conditional GET: an unchanged page skips parsing and the AI call
+            cached = self.db.get_cache_validators(url)
+            if cached:
+                if cached['etag']:
+                    headers['If-None-Match'] = cached['etag']
+                if cached['last_modified']:
+                    headers['If-Modified-Since'] = cached['last_modified']
+            response = _SESSION.get(url, headers=headers, timeout=10, stream=True)
             response.raise_for_status()
+            read_capped(response)
+            
+            # Same cache lifetime rule as generate_rss
+            cache_hours = 6 if 'blog' in url.lower() or 'news' in url.lower() else 24
+            if response.status_code == 304:
+                logger.debug("Not modified since last update: %s", url)
+                self.db.refresh_cached_content(url, cache_hours)
+                return True
             
-            soup = BeautifulSoup(response.content, 'html.parser')
+            try:
+                soup = BeautifulSoup(response.content, 'lxml')
+            except Exception:
+                soup = BeautifulSoup(response.content, 'html.parser')
             html_content = soup.get_text()
             
             # Extract with AI
@@ -101,21 +131,23 @@ class FeedScheduler:
                 items=ai_result.get('items', [])
             )
             
+            # Validators are only stored once the feed is updated, so a failed
+            # AI call is retried next time instead of being skipped on 304
+            self.db.save_cached_content(
+                url, response.text, response.status_code, cache_hours,
+                etag=response.headers.get('ETag'),
+                last_modified=response.headers.get('Last-Modified')
+            )
+            
             return True
             
         except Exception as e:
-            print(f"Update error for {feed['url']}: {str(e)}")
+            logger.error("Update error for %s: %s", feed['url'], e)
             return False
             
     def update_feed_manually(self, feed_id, api_key):
         """Manually update a specific feed"""
-        feeds = self.db.get_all_feeds()
-        feed_info = None
-        for feed in feeds:
-            if feed['id'] == feed_id:
-                feed_info = feed
-                break
-                
+        feed_info = self.db.get_feed_by_id(feed_id)
         if not feed_info:
             return False, "Feed not found"
             
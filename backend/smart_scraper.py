@@ -7,6 +7,24 @@ from bs4 import BeautifulSoup
 from urllib.parse import urljoin
 from datetime import datetime
 import re
+from page_fetch import create_session, read_capped
+
+# Class-name keyword matchers, compiled once (BS4 runs them per class value)
+ARTICLE_CLASS_RE = re.compile(r'post|article|news|entry|item|story|blog', re.I)
+DESCRIPTION_CLASS_RE = re.compile(r'excerpt|summary|description', re.I)
+DATE_CLASS_RE = re.compile(r'date|time|published|created', re.I)
+
+# Image strategy matchers, compiled once
+ABSOLUTE_CLASS_RE = re.compile(r'absolute', re.I)
+FEATURED_IMG_CLASS_RE = re.compile(r'featured|thumbnail|cover|hero|main|primary', re.I)
+BAD_IMG_SRC_RE = re.compile(r'icon|logo|avatar|emoji|spinner|button', re.I)
+BAD_IMG_ALT_RE = re.compile(r'icon|logo|avatar|emoji', re.I)
+BACKGROUND_IMAGE_RE = re.compile(r'background-image:\s*url\(["\']?([^"\']+)["\']?\)')
+DATA_IMAGE_ATTR_RE = re.compile(r'data-src|data-image|data-bg', re.I)
+YEAR_RE = re.compile(r'202[0-9]')
+
+# Pattern-based updates share one pooled session
+_SESSION = create_session()
 
 class SmartScraper:
     def __init__(self):
@@ -27,15 +45,13 @@ class SmartScraper:
         }
         
         try:
-            response = requests.get(url, headers=headers, timeout=10)
+            response = _SESSION.get(url, headers=headers, timeout=10, stream=True)
             response.raise_for_status()
+            read_capped(response)
             
-            # Try to fix common HTML issues
-            html_content = response.content
-            
-            # Fix encoding issues
-            if response.encoding:
-                html_content = response.text.encode('utf-8')
+            # Fix encoding issues: with a known charset hand BS4 the decoded
+            # text directly instead of re-encoding it to UTF-8 bytes
+            html_content = response.text if response.encoding else response.content
             
         except requests.RequestException as e:
             return {"error": f"Failed to fetch website: {str(e)}"}
@@ -85,10 +101,9 @@ class SmartScraper:
             classes = pattern.get('classes', [])
             
             if classes:
-                # Find by tag and class
-                found = soup.find_all(tag, class_=lambda x: x and any(
-                    cls in x for cls in classes
-                ))
+                # Find by tag and class (any of the saved class fragments)
+                class_re = re.compile('|'.join(re.escape(cls) for cls in classes))
+                found = soup.find_all(tag, class_=class_re)
                 containers.extend(found)
             else:
                 # Find by tag only
@@ -112,9 +127,7 @@ class SmartScraper:
         containers.extend(soup.find_all('article'))
         
         # Look for divs with article-like classes
-        article_divs = soup.find_all('div', class_=lambda x: x and any(
-            keyword in x.lower() for keyword in ['post', 'article', 'news', 'entry', 'item', 'story', 'blog']
-        ))
+        article_divs = soup.find_all('div', class_=ARTICLE_CLASS_RE)
         containers.extend(article_divs)
         
         return containers
@@ -190,9 +203,7 @@ class SmartScraper:
     def _extract_description(self, container, patterns):
         """Extract article description"""
         # Try to find excerpt or summary
-        desc_elem = container.find(class_=lambda x: x and any(
-            keyword in x.lower() for keyword in ['excerpt', 'summary', 'description']
-        ))
+        desc_elem = container.find(class_=DESCRIPTION_CLASS_RE)
         
         if desc_elem:
             return desc_elem.get_text().strip()[:400]  # Limit to 400 chars
@@ -219,9 +230,7 @@ class SmartScraper:
                 return self._parse_date_text(text)
         
         # Try date classes
-        date_elem = container.find(class_=lambda x: x and any(
-            keyword in x.lower() for keyword in ['date', 'time', 'published', 'created']
-        ))
+        date_elem = container.find(class_=DATE_CLASS_RE)
         
         if date_elem:
             text = date_elem.get_text().strip()
@@ -235,7 +244,7 @@ class SmartScraper:
         today = datetime.now()
         
         # Look for year patterns
-        year_match = re.search(r'202[0-9]', text)
+        year_match = YEAR_RE.search(text)
         if year_match:
             year = year_match.group()
             # Try to extract month and day too
@@ -256,9 +265,7 @@ class SmartScraper:
                         return self._normalize_url(img_elem['src'], base_url)
         
         # Strategy 2: Look for images in absolute positioned divs (common in modern sites)
-        absolute_divs = container.find_all('div', class_=lambda x: x and any(
-            'absolute' in ' '.join(x).lower() for x in [x] if x
-        ))
+        absolute_divs = container.find_all('div', class_=ABSOLUTE_CLASS_RE)
         
         for div in absolute_divs:
             img = div.find('img', src=True)
@@ -285,9 +292,7 @@ class SmartScraper:
                 return self._normalize_url(img_elem['src'], base_url)
         
         # Strategy 4: Look for images with specific class patterns
-        featured_img = container.find('img', class_=lambda x: x and any(
-            keyword in ' '.join(x).lower() for keyword in ['featured', 'thumbnail', 'cover', 'hero', 'main', 'primary']
-        ))
+        featured_img = container.find('img', class_=FEATURED_IMG_CLASS_RE)
         
         if featured_img and featured_img.get('src'):
             return self._normalize_url(featured_img['src'], base_url)
@@ -295,35 +300,17 @@ class SmartScraper:
         # Strategy 5: Look for first significant image in any div
         for img in container.find_all('img', src=True):
             src = img.get('src', '')
-            alt = img.get('alt', '').lower()
             
             # Skip small images, icons, and logos
-            if any(keyword in src.lower() for keyword in ['icon', 'logo', 'avatar', 'emoji', 'spinner', 'button']):
-                continue
-            if any(keyword in alt for keyword in ['icon', 'logo', 'avatar', 'emoji']):
+            if BAD_IMG_SRC_RE.search(src) or BAD_IMG_ALT_RE.search(img.get('alt', '')):
                 continue
             
             # Check image dimensions if available
             width = img.get('width')
             height = img.get('height')
-            if width and height:
-                try:
-                    w, h = int(width), int(height)
-                    if w < 80 or h < 80:  # Skip very small images
-                        continue
-                except:
-                    pass
-            
-            # Check if image is in a meaningful container
-            parent = img.parent
-            if parent:
-                parent_classes = ' '.join(parent.get('class', [])).lower()
-                if any(keyword in parent_classes for keyword in ['image', 'photo', 'picture', 'media', 'visual']):
-                    return self._normalize_url(src, base_url)
-                
-                # Check for modern CSS classes like absolute positioning
-                if any(keyword in parent_classes for keyword in ['absolute', 'relative', 'flex', 'grid']):
-                    return self._normalize_url(src, base_url)
+            if width and height and width.isdigit() and height.isdigit():
+                if int(width) < 80 or int(height) < 80:  # Skip very small images
+                    continue
             
             return self._normalize_url(src, base_url)
         
@@ -331,14 +318,14 @@ class SmartScraper:
         for elem in container.find_all(style=True):
             style = elem.get('style', '')
             if 'background-image' in style:
-                match = re.search(r'background-image:\s*url\(["\']?([^"\']+)["\']?\)', style)
+                match = BACKGROUND_IMAGE_RE.search(style)
                 if match:
                     return self._normalize_url(match.group(1), base_url)
         
         # Strategy 7: Look for data attributes that might contain image URLs
         for elem in container.find_all():
             for attr_name, attr_value in elem.attrs.items():
-                if isinstance(attr_value, str) and any(keyword in attr_name.lower() for keyword in ['data-src', 'data-image', 'data-bg']):
+                if isinstance(attr_value, str) and DATA_IMAGE_ATTR_RE.search(attr_name):
                     if attr_value.startswith(('http', '/', '.')):
                         return self._normalize_url(attr_value, base_url)
         